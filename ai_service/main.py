@@ -564,15 +564,28 @@ async def websocket_stream(websocket: WebSocket, session_id: str):
     
     logger.info(f"WebSocket connected for session: {session_id}")
     
-    try:
+    async def receive_frames():
+        """Read frames as fast as they arrive; only the latest is kept."""
         while True:
-            # Receive frame data
             data = await websocket.receive_text()
             
             if not state.pipeline or not state.pipeline.is_running:
                 await websocket.send_json({"error": "Session not active"})
                 continue
             
+            if state.pipeline.submit_frame(data):
+                logger.debug(f"Dropped stale frame for session: {session_id}")
+    
+    async def process_frames():
+        """Process the most recent frame at the pipeline's target rate."""
+        while True:
+            if not state.pipeline or not state.pipeline.is_running:
+                # Models still loading or session stopped; receive_frames reports it
+                await asyncio.sleep(0.1)
+                continue
+            
+            data = await state.pipeline.next_frame()
+            
             try:
                 # Decode and process frame
                 image = decode_base64_image(data)
@@ -589,14 +602,35 @@ async def websocket_stream(websocket: WebSocket, session_id: str):
                 # Send result back
                 await websocket.send_json(result)
                 
+            except WebSocketDisconnect:
+                raise
             except Exception as e:
                 await websocket.send_json({"error": str(e)})
-                
+    
+    receiver = asyncio.create_task(receive_frames())
+    processor = asyncio.create_task(process_frames())
+    
+    try:
+        done, pending = await asyncio.wait(
+            {receiver, processor},
+            return_when=asyncio.FIRST_COMPLETED
+        )
+        
+        for task in pending:
+            task.cancel()
+        
+        for task in done:
+            task.result()
+    
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected for session: {session_id}")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
+        # Also runs when the handler itself is cancelled mid-wait
+        for task in (receiver, processor):
+            task.cancel()
+        await asyncio.gather(receiver, processor, return_exceptions=True)
         logger.info(f"WebSocket connection closed for session: {session_id}")
 
 
@@ -8,6 +8,7 @@ import cv2
 from typing import List, Dict, Tuple, Optional
 from pathlib import Path
 import threading
+from collections import defaultdict
 from loguru import logger
 
 # Lazy imports to handle missing dependencies gracefully
@@ -148,39 +149,48 @@ class PersonDetector:
         
         phones = [obj for obj in objects if obj['class_name'] == 'phone']
         
+        if not phones or not persons:
+            return phone_associations
+        
+        person_bboxes = np.array([person['bbox'] for person in persons], dtype=np.float64)
+        person_centers = (person_bboxes[:, :2] + person_bboxes[:, 2:]) / 2
+        
+        # Uniform grid spatial hash: each cell lists the persons whose bbox covers it
+        cell_size = max(float(np.mean(person_bboxes[:, 3] - person_bboxes[:, 1])), 1.0)
+        cells = np.floor(person_bboxes / cell_size).astype(int)
+        grid = defaultdict(list)
+        
+        for i, (cx1, cy1, cx2, cy2) in enumerate(cells):
+            for cx in range(cx1, cx2 + 1):
+                for cy in range(cy1, cy2 + 1):
+                    grid[(cx, cy)].append(i)
+        
         for phone in phones:
-            phone_bbox = np.array(phone['bbox'])
+            phone_bbox = phone['bbox']
             phone_center = np.array([
                 (phone_bbox[0] + phone_bbox[2]) / 2,
                 (phone_bbox[1] + phone_bbox[3]) / 2
             ])
             
-            # Find nearest person
-            min_dist = float('inf')
+            # Lowest-index person whose bbox contains the phone center
+            cell = (
+                int(np.floor(phone_center[0] / cell_size)),
+                int(np.floor(phone_center[1] / cell_size))
+            )
             nearest_person_idx = -1
             
-            for i, person in enumerate(persons):
-                person_bbox = np.array(person['bbox'])
-                
-                # Check if phone center is inside person bbox
-                if (person_bbox[0] <= phone_center[0] <= person_bbox[2] and
-                    person_bbox[1] <= phone_center[1] <= person_bbox[3]):
-                    nearest_person_idx = i
-                    break
-                
-                # Calculate distance to person bbox center
-                person_center = np.array([
-                    (person_bbox[0] + person_bbox[2]) / 2,
-                    (person_bbox[1] + person_bbox[3]) / 2
-                ])
-                dist = np.linalg.norm(phone_center - person_center)
-                
-                if dist < min_dist:
-                    min_dist = dist
+            for i in grid.get(cell, ()):
+                x1, y1, x2, y2 = person_bboxes[i]
+                if (x1 <= phone_center[0] <= x2 and y1 <= phone_center[1] <= y2 and
+                        (nearest_person_idx < 0 or i < nearest_person_idx)):
                     nearest_person_idx = i
             
-            if nearest_person_idx >= 0:
-                phone_associations.append((nearest_person_idx, phone))
+            # Otherwise fall back to the person with the nearest center
+            if nearest_person_idx < 0:
+                dists = np.linalg.norm(person_centers - phone_center, axis=1)
+                nearest_person_idx = int(np.argmin(dists))
+            
+            phone_associations.append((nearest_person_idx, phone))
         
         return phone_associations
 
@@ -8,6 +8,7 @@ import cv2
 import time
 import asyncio
 import threading
+import functools
 from typing import Dict, List, Optional, Callable
 from dataclasses import dataclass, field
 from collections import deque
@@ -22,6 +23,50 @@ from models import (
     PostureState
 )
 from trackers import ByteTracker, STrack
+from trackers.bytetrack import bbox_ious
+
+# Optional JIT for per-frame aggregation (falls back to NumPy)
+try:
+    from numba import njit
+    
+    @njit(cache=True, fastmath=True)
+    def _mean_attention(scores: np.ndarray) -> float:
+        """Mean of non-negative scores; negative entries mark missing values."""
+        total = 0.0
+        count = 0
+        for i in range(scores.shape[0]):
+            value = scores[i]
+            if value >= 0:
+                total += value
+                count += 1
+        return 0.0 if count == 0 else total / count
+except ImportError:
+    def _mean_attention(scores: np.ndarray) -> float:
+        """Mean of non-negative scores; negative entries mark missing values."""
+        valid = scores[scores >= 0]
+        return float(valid.mean()) if valid.size else 0.0
+
+
+# Model instances are shared by every pipeline; only the tracker is per-session
+@functools.lru_cache(maxsize=1)
+def _get_person_detector() -> PersonDetector:
+    detector = PersonDetector()
+    detector.initialize()
+    return detector
+
+
+@functools.lru_cache(maxsize=1)
+def _get_face_detector() -> FaceDetector:
+    detector = FaceDetector()
+    detector.initialize()
+    return detector
+
+
+@functools.lru_cache(maxsize=1)
+def _get_pose_gaze_analyzer() -> PostureGazeAnalyzer:
+    analyzer = PostureGazeAnalyzer()
+    analyzer.initialize()
+    return analyzer
 
 
 @dataclass
@@ -31,8 +76,9 @@ class TrackMetrics:
     student_id: Optional[str] = None
     student_name: Optional[str] = None
     
-    first_seen: datetime = field(default_factory=datetime.now)
-    last_seen: datetime = field(default_factory=datetime.now)
+    # Epoch seconds; formatted only when session analytics are compiled
+    first_seen: float = field(default_factory=time.time)
+    last_seen: float = 0.0
     
     attention_scores: List[float] = field(default_factory=list)
     posture_scores: List[float] = field(default_factory=list)
@@ -77,6 +123,38 @@ class MonitoringPipeline:
     - Event generation
     """
     
+    # Event payload templates, copied and filled in when an event fires
+    _EVENT_TEMPLATES = {
+        'student_entered': {
+            'eventType': 'student_entered', 'trackId': None,
+            'confidence': None, 'timestamp': None
+        },
+        'attention_high': {
+            'eventType': 'attention_high', 'trackId': None, 'studentId': None,
+            'confidence': None, 'timestamp': None, 'data': None
+        },
+        'attention_low': {
+            'eventType': 'attention_low', 'trackId': None, 'studentId': None,
+            'confidence': None, 'timestamp': None, 'data': None
+        },
+        'drowsiness_detected': {
+            'eventType': 'drowsiness_detected', 'trackId': None, 'studentId': None,
+            'confidence': None, 'timestamp': None, 'data': None
+        },
+        'posture_poor': {
+            'eventType': 'posture_poor', 'trackId': None, 'studentId': None,
+            'confidence': None, 'timestamp': None, 'data': None
+        },
+        'posture_good': {
+            'eventType': 'posture_good', 'trackId': None, 'studentId': None,
+            'confidence': None, 'timestamp': None
+        },
+        'phone_detected': {
+            'eventType': 'phone_detected', 'trackId': None, 'studentId': None,
+            'confidence': None, 'timestamp': None
+        }
+    }
+    
     def __init__(
         self,
         target_fps: int = 8,
@@ -100,10 +178,10 @@ class MonitoringPipeline:
         self.on_event = on_event
         self.on_frame = on_frame
         
-        # Models
-        self.person_detector = PersonDetector()
-        self.face_detector = FaceDetector()
-        self.pose_gaze_analyzer = PostureGazeAnalyzer()
+        # Models (shared across pipelines)
+        self.person_detector = _get_person_detector()
+        self.face_detector = _get_face_detector()
+        self.pose_gaze_analyzer = _get_pose_gaze_analyzer()
         self.tracker = ByteTracker(
             track_thresh=0.5,
             track_buffer=30,
@@ -119,6 +197,10 @@ class MonitoringPipeline:
         self._last_frame_time = 0
         self._frame_times = deque(maxlen=30)
         
+        # Latest-frame-wins ingest buffer: stale frames are dropped under load
+        self._ingest_queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self.dropped_frames = 0
+        
         # Recognition cooldown per track
         self._recognition_cooldown: Dict[int, float] = {}
         self._recognition_interval = 2.0  # Seconds between recognition attempts
@@ -128,19 +210,57 @@ class MonitoringPipeline:
         self.attention_low_threshold = 0.4
         self.phone_detection_frames = 3  # Consecutive frames to confirm phone
         self.posture_poor_threshold = 0.5
+        
+        # State transition tables: (previous_state, new_state) -> event type.
+        # Stable states (the common case) have no entry and short-circuit.
+        attention_events = {
+            AttentionState.FOCUSED.value: 'attention_high',
+            AttentionState.DISTRACTED.value: 'attention_low',
+            AttentionState.DROWSY.value: 'drowsiness_detected'
+        }
+        self._attention_transitions = {
+            (prev.value, new_state): event_type
+            for prev in AttentionState
+            for new_state, event_type in attention_events.items()
+            if prev.value != new_state
+        }
+        
+        poor_postures = (PostureState.SLOUCHING.value, PostureState.LEANING.value)
+        self._posture_transitions = {
+            (prev.value, new_state): 'posture_poor'
+            for prev in PostureState
+            for new_state in poor_postures
+            if prev.value != new_state
+        }
+        self._posture_transitions.update({
+            (prev_state, PostureState.GOOD.value): 'posture_good'
+            for prev_state in poor_postures
+        })
+    
+    @property
+    def on_event(self) -> Optional[Callable]:
+        """Callback for events (async or sync)."""
+        return self._on_event
+    
+    @on_event.setter
+    def on_event(self, callback: Optional[Callable]):
+        # Resolve the callback shape once instead of on every emission
+        self._on_event = callback
+        self._on_event_is_async = asyncio.iscoroutinefunction(callback)
+    
+    @property
+    def on_frame(self) -> Optional[Callable]:
+        """Callback for processed frames (async or sync)."""
+        return self._on_frame
+    
+    @on_frame.setter
+    def on_frame(self, callback: Optional[Callable]):
+        self._on_frame = callback
+        self._on_frame_is_async = asyncio.iscoroutinefunction(callback)
     
     def initialize(self):
-        """Initialize all models."""
-        logger.info("Initializing monitoring pipeline models...")
-        
-        try:
-            self.person_detector.initialize()
-            self.face_detector.initialize()
-            self.pose_gaze_analyzer.initialize()
-            logger.info("All models initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize models: {e}")
-            raise
+        """Initialize all models (no-op: shared models load on construction)."""
+        logger.info("Monitoring pipeline models ready")
     
     def start_session(self, session_id: str):
         """Start a new monitoring session."""
@@ -155,6 +275,10 @@ class MonitoringPipeline:
         
         self._recognition_cooldown.clear()
         
+        while not self._ingest_queue.empty():
+            self._ingest_queue.get_nowait()
+        self.dropped_frames = 0
+        
         logger.info(f"Monitoring session started: {session_id}")
     
     def stop_session(self) -> Dict:
@@ -180,6 +304,36 @@ class MonitoringPipeline:
         self.known_embeddings = embeddings
         logger.info(f"Updated known embeddings: {len(embeddings)} students")
     
+    def submit_frame(self, frame) -> bool:
+        """
+        Submit a frame for processing, replacing any frame still waiting.
+        
+        Args:
+            frame: Frame payload to be consumed via next_frame()
+        
+        Returns:
+            True if a stale pending frame was dropped
+        """
+        dropped = False
+        
+        try:
+            self._ingest_queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self._ingest_queue.get_nowait()
+            self._ingest_queue.put_nowait(frame)
+            self.dropped_frames += 1
+            dropped = True
+        
+        return dropped
+    
+    async def next_frame(self):
+        """Wait for the latest submitted frame, paced to target_fps."""
+        wait = self._last_frame_time + self.frame_interval - time.time()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        
+        return await self._ingest_queue.get()
+    
     def process_frame_sync(self, frame: np.ndarray) -> Dict:
         """
         Process a single frame synchronously (simplified version).
@@ -333,7 +487,9 @@ class MonitoringPipeline:
             phone_associations = self.person_detector.detect_phones_near_persons(
                 persons, objects
             )
-            phone_track_ids = set()
+            phone_track_ids = self._find_tracks_with_phone(
+                active_tracks, phone_associations, persons
+            )
             
             # === Step 4: Process Each Track ===
             track_results = []
@@ -341,7 +497,7 @@ class MonitoringPipeline:
             
             for track in active_tracks:
                 track_data = await self._process_track(
-                    frame, track, phone_associations, persons
+                    frame, track, phone_track_ids, start_time
                 )
                 track_results.append(track_data)
                 
@@ -350,7 +506,8 @@ class MonitoringPipeline:
                     events.extend(track_data['events'])
             
             # === Step 5: Update Session Metrics ===
-            self._update_session_metrics(track_results)
+            average_attention = self._calculate_average_attention(track_results)
+            self._update_session_metrics(track_results, average_attention)
             
             # Build result
             result['detections'] = {
@@ -360,30 +517,30 @@ class MonitoringPipeline:
             result['tracks'] = track_results
             result['metrics'] = {
                 'student_count': len(active_tracks),
-                'average_attention': self._calculate_average_attention(track_results),
+                'average_attention': average_attention,
                 'fps': self._calculate_fps()
             }
             result['events'] = events
             
             # === Step 6: Callbacks ===
             # Queue events
-            if events and self.on_event:
+            if events and self._on_event:
                 for event in events:
                     try:
-                        if asyncio.iscoroutinefunction(self.on_event):
-                            await self.on_event(event)
+                        if self._on_event_is_async:
+                            await self._on_event(event)
                         else:
-                            self.on_event(event)
+                            self._on_event(event)
                     except Exception as e:
                         logger.error(f"Event callback error: {e}")
             
             # Frame callback
-            if self.on_frame:
+            if self._on_frame:
                 try:
-                    if asyncio.iscoroutinefunction(self.on_frame):
-                        await self.on_frame(result)
+                    if self._on_frame_is_async:
+                        await self._on_frame(result)
                     else:
-                        self.on_frame(result)
+                        self._on_frame(result)
                 except Exception as e:
                     logger.error(f"Frame callback error: {e}")
             
@@ -399,14 +556,17 @@ class MonitoringPipeline:
         self, 
         frame: np.ndarray, 
         track: STrack,
-        phone_associations: List,
-        persons: List[Dict]
+        phone_track_ids: set,
+        frame_time: float
     ) -> Dict:
         """Process a single track for face, pose, gaze, and events."""
         
+        # Single conversion: the list serves both the JSON payload and the ROI
+        bbox = track.tlbr.tolist()
+        
         track_data = {
             'track_id': track.track_id,
-            'bbox': track.tlbr.tolist(),
+            'bbox': bbox,
             'score': track.score,
             'student_id': track.student_id,
             'student_name': None,
@@ -419,21 +579,19 @@ class MonitoringPipeline:
         # Get or create track metrics
         if track.track_id not in self.session_metrics.track_metrics:
             self.session_metrics.track_metrics[track.track_id] = TrackMetrics(
-                track_id=track.track_id
+                track_id=track.track_id,
+                first_seen=frame_time
             )
             # New track event
-            track_data['events'].append({
-                'eventType': 'student_entered',
-                'trackId': track.track_id,
-                'confidence': track.score,
-                'timestamp': datetime.now().isoformat()
-            })
+            track_data['events'].append(self._make_event(
+                'student_entered', track, track.score, datetime.now().isoformat()
+            ))
         
         metrics = self.session_metrics.track_metrics[track.track_id]
-        metrics.last_seen = datetime.now()
+        metrics.last_seen = frame_time
         
         # Extract person region
-        x1, y1, x2, y2 = [int(c) for c in track.tlbr]
+        x1, y1, x2, y2 = map(int, bbox)
         x1, y1 = max(0, x1), max(0, y1)
         x2, y2 = min(frame.shape[1], x2), min(frame.shape[0], y2)
         
@@ -443,10 +601,9 @@ class MonitoringPipeline:
         person_roi = frame[y1:y2, x1:x2]
         
         # === Face Recognition (with cooldown) ===
-        current_time = time.time()
         cooldown = self._recognition_cooldown.get(track.track_id, 0)
         
-        if not track.student_id and current_time - cooldown > self._recognition_interval:
+        if not track.student_id and frame_time - cooldown > self._recognition_interval:
             face_result = await self._try_face_recognition(person_roi)
             
             if face_result:
@@ -456,7 +613,7 @@ class MonitoringPipeline:
                 track_data['student_id'] = face_result['student_id']
                 track_data['student_name'] = face_result.get('student_name')
             
-            self._recognition_cooldown[track.track_id] = current_time
+            self._recognition_cooldown[track.track_id] = frame_time
         else:
             track_data['student_id'] = track.student_id
             track_data['student_name'] = metrics.student_name
@@ -487,13 +644,7 @@ class MonitoringPipeline:
             track_data['events'].extend(posture_events)
         
         # === Phone Detection ===
-        person_has_phone = any(
-            idx == track.track_id or self._track_matches_person(track, persons[idx])
-            for idx, _ in phone_associations
-            if idx < len(persons)
-        )
-        
-        if person_has_phone:
+        if track.track_id in phone_track_ids:
             metrics.phone_detected_frames += 1
         else:
             metrics.phone_detected_frames = max(0, metrics.phone_detected_frames - 1)
@@ -507,10 +658,34 @@ class MonitoringPipeline:
         
         return track_data
     
-    def _track_matches_person(self, track: STrack, person: Dict) -> bool:
-        """Check if track bbox matches person detection."""
-        from trackers.bytetrack import bbox_iou
-        return bbox_iou(track.tlbr, np.array(person['bbox'])) > 0.5
+    def _find_tracks_with_phone(
+        self,
+        tracks: List[STrack],
+        phone_associations: List,
+        persons: List[Dict]
+    ) -> set:
+        """Get IDs of tracks matching a person associated with a phone."""
+        phone_person_idxs = {
+            idx for idx, _ in phone_associations if idx < len(persons)
+        }
+        
+        if not tracks or not phone_person_idxs:
+            return set()
+        
+        # Track IDs that coincide with a person index count as matches too
+        phone_track_ids = {
+            track.track_id for track in tracks
+            if track.track_id in phone_person_idxs
+        }
+        
+        ious = bbox_ious(
+            np.array([track.bbox for track in tracks]),
+            np.array([persons[idx]['bbox'] for idx in sorted(phone_person_idxs)])
+        )
+        for t in np.flatnonzero(ious.max(axis=1) > 0.5):
+            phone_track_ids.add(tracks[t].track_id)
+        
+        return phone_track_ids
     
     async def _try_face_recognition(self, roi: np.ndarray) -> Optional[Dict]:
         """Try to recognize face in ROI."""
@@ -542,58 +717,36 @@ class MonitoringPipeline:
         gaze_data: Dict
     ) -> List[Dict]:
         """Check for attention-related events."""
-        events = []
-        score = gaze_data['score']
         state = gaze_data['state']
+        event_type = self._attention_transitions.get(
+            (metrics.last_attention_state, state)
+        )
+        metrics.last_attention_state = state
         
-        timestamp = datetime.now().isoformat()
-        
-        # State transition events
-        if metrics.last_attention_state != state:
-            if state == 'focused' and score >= self.attention_high_threshold:
-                events.append({
-                    'eventType': 'attention_high',
-                    'trackId': track.track_id,
-                    'studentId': track.student_id,
-                    'confidence': score,
-                    'timestamp': timestamp,
-                    'data': {
-                        'gazeDirection': {
-                            'yaw': gaze_data['yaw'],
-                            'pitch': gaze_data['pitch']
-                        }
-                    }
-                })
-            elif state == 'distracted':
-                metrics.distraction_count += 1
-                events.append({
-                    'eventType': 'attention_low',
-                    'trackId': track.track_id,
-                    'studentId': track.student_id,
-                    'confidence': 1 - score,
-                    'timestamp': timestamp,
-                    'data': {
-                        'gazeDirection': {
-                            'yaw': gaze_data['yaw'],
-                            'pitch': gaze_data['pitch']
-                        }
-                    }
-                })
-            elif state == 'drowsy':
-                events.append({
-                    'eventType': 'drowsiness_detected',
-                    'trackId': track.track_id,
-                    'studentId': track.student_id,
-                    'confidence': 1 - gaze_data['eye_aspect_ratio'],
-                    'timestamp': timestamp,
-                    'data': {
-                        'eyeAspectRatio': gaze_data['eye_aspect_ratio']
-                    }
-                })
+        if event_type is None:
+            return []
         
-        metrics.last_attention_state = state
+        score = gaze_data['score']
+        timestamp = datetime.now().isoformat()
         
-        return events
+        if event_type == 'attention_high':
+            if score < self.attention_high_threshold:
+                return []
+            confidence = score
+        elif event_type == 'attention_low':
+            metrics.distraction_count += 1
+            confidence = 1 - score
+        else:
+            ear = gaze_data['eye_aspect_ratio']
+            return [self._make_event(
+                event_type, track, 1 - ear, timestamp,
+                {'eyeAspectRatio': ear}
+            )]
+        
+        return [self._make_event(
+            event_type, track, confidence, timestamp,
+            {'gazeDirection': {'yaw': gaze_data['yaw'], 'pitch': gaze_data['pitch']}}
+        )]
     
     def _check_posture_events(
         self,
@@ -602,37 +755,25 @@ class MonitoringPipeline:
         pose_data: Dict
     ) -> List[Dict]:
         """Check for posture-related events."""
-        events = []
         state = pose_data['state']
-        score = pose_data['score']
+        event_type = self._posture_transitions.get(
+            (metrics.last_posture_state, state)
+        )
+        metrics.last_posture_state = state
         
-        timestamp = datetime.now().isoformat()
+        if event_type is None:
+            return []
         
-        if metrics.last_posture_state != state:
-            if state in ['slouching', 'leaning']:
-                events.append({
-                    'eventType': 'posture_poor',
-                    'trackId': track.track_id,
-                    'studentId': track.student_id,
-                    'confidence': 1 - score,
-                    'timestamp': timestamp,
-                    'data': {
-                        'postureScore': score,
-                        'postureState': state
-                    }
-                })
-            elif state == 'good' and metrics.last_posture_state in ['slouching', 'leaning']:
-                events.append({
-                    'eventType': 'posture_good',
-                    'trackId': track.track_id,
-                    'studentId': track.student_id,
-                    'confidence': score,
-                    'timestamp': timestamp
-                })
+        score = pose_data['score']
+        timestamp = datetime.now().isoformat()
         
-        metrics.last_posture_state = state
+        if event_type == 'posture_poor':
+            return [self._make_event(
+                event_type, track, 1 - score, timestamp,
+                {'postureScore': score, 'postureState': state}
+            )]
         
-        return events
+        return [self._make_event(event_type, track, score, timestamp)]
     
     def _check_phone_events(
         self,
@@ -640,23 +781,38 @@ class MonitoringPipeline:
         metrics: TrackMetrics
     ) -> List[Dict]:
         """Check for phone usage events."""
-        events = []
-        timestamp = datetime.now().isoformat()
-        
         # Only trigger if this is a new phone detection
-        if metrics.phone_detected_frames == self.phone_detection_frames:
-            metrics.phone_usage_count += 1
-            events.append({
-                'eventType': 'phone_detected',
-                'trackId': track.track_id,
-                'studentId': track.student_id,
-                'confidence': 0.8,
-                'timestamp': timestamp
-            })
+        if metrics.phone_detected_frames != self.phone_detection_frames:
+            return []
+        
+        metrics.phone_usage_count += 1
         
-        return events
+        return [self._make_event(
+            'phone_detected', track, 0.8, datetime.now().isoformat()
+        )]
+    
+    def _make_event(
+        self,
+        event_type: str,
+        track: STrack,
+        confidence: float,
+        timestamp: str,
+        data: Optional[Dict] = None
+    ) -> Dict:
+        """Build an event payload from its pre-built template."""
+        event = self._EVENT_TEMPLATES[event_type].copy()
+        event['trackId'] = track.track_id
+        event['confidence'] = confidence
+        event['timestamp'] = timestamp
+        
+        if 'studentId' in event:
+            event['studentId'] = track.student_id
+        if data is not None:
+            event['data'] = data
+        
+        return event
     
-    def _update_session_metrics(self, track_results: List[Dict]):
+    def _update_session_metrics(self, track_results: List[Dict], avg_attention: float):
         """Update aggregated session metrics."""
         if self.session_metrics is None:
             return
@@ -670,7 +826,6 @@ class MonitoringPipeline:
         
         # Update attention timeline
         if track_results:
-            avg_attention = self._calculate_average_attention(track_results)
             self.session_metrics.attention_timeline.append({
                 'timestamp': datetime.now().isoformat(),
                 'value': avg_attention,
@@ -679,16 +834,21 @@ class MonitoringPipeline:
     
     def _calculate_average_attention(self, track_results: List[Dict]) -> float:
         """Calculate average attention score across all tracks."""
-        attention_scores = [
-            t['attention']['score'] 
-            for t in track_results 
-            if t.get('attention') and t['attention'].get('score') is not None
-        ]
-        
-        if not attention_scores:
+        if not track_results:
             return 0
         
-        return sum(attention_scores) / len(attention_scores)
+        scores = np.fromiter(
+            (
+                t['attention']['score']
+                if t.get('attention') and t['attention'].get('score') is not None
+                else -1.0
+                for t in track_results
+            ),
+            dtype=np.float64,
+            count=len(track_results)
+        )
+        
+        return float(_mean_attention(scores))
     
     def _calculate_fps(self) -> float:
         """Calculate current processing FPS."""
@@ -718,11 +878,9 @@ class MonitoringPipeline:
                 ),
                 'distractionCount': track_metrics.distraction_count,
                 'phoneUsageCount': track_metrics.phone_usage_count,
-                'firstSeen': track_metrics.first_seen.isoformat(),
-                'lastSeen': track_metrics.last_seen.isoformat(),
-                'totalTimePresent': (
-                    track_metrics.last_seen - track_metrics.first_seen
-                ).total_seconds()
+                'firstSeen': datetime.fromtimestamp(track_metrics.first_seen).isoformat(),
+                'lastSeen': datetime.fromtimestamp(track_metrics.last_seen).isoformat(),
+                'totalTimePresent': track_metrics.last_seen - track_metrics.first_seen
             })
         
         # Calculate overall metrics
@@ -758,6 +916,7 @@ class MonitoringPipeline:
             'current_student_count': self.session_metrics.current_student_count,
             'peak_student_count': self.session_metrics.peak_student_count,
             'frame_count': self.session_metrics.frame_count,
+            'dropped_frames': self.dropped_frames,
             'fps': self._calculate_fps(),
             'tracker_stats': self.tracker.get_stats()
         }
@@ -2,6 +2,6 @@
 Trackers Module
 """
 
-from .bytetrack import ByteTracker, STrack, TrackState
+from .bytetrack import ByteTracker, STrack, TrackState, TrackTable
 
-__all__ = ['ByteTracker', 'STrack', 'TrackState']
+__all__ = ['ByteTracker', 'STrack', 'TrackState', 'TrackTable']
@@ -0,0 +1,39 @@
+"""
+Numba IoU Kernel
+Optional JIT-compiled pairwise IoU used for large track/detection matrices
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, parallel=True, fastmath=True)
+    def iou_matrix_nb(tlbrs1: np.ndarray, tlbrs2: np.ndarray, out: np.ndarray) -> None:
+        """Write the pairwise IoU of (N, 4) and (M, 4) tlbr arrays into out (N, M)."""
+        n = tlbrs1.shape[0]
+        m = tlbrs2.shape[0]
+        
+        for i in prange(n):
+            ax1 = tlbrs1[i, 0]
+            ay1 = tlbrs1[i, 1]
+            ax2 = tlbrs1[i, 2]
+            ay2 = tlbrs1[i, 3]
+            area1 = (ax2 - ax1) * (ay2 - ay1)
+            
+            for j in range(m):
+                w = min(ax2, tlbrs2[j, 2]) - max(ax1, tlbrs2[j, 0])
+                h = min(ay2, tlbrs2[j, 3]) - max(ay1, tlbrs2[j, 1])
+                inter_area = max(w, 0.0) * max(h, 0.0)
+                
+                area2 = (tlbrs2[j, 2] - tlbrs2[j, 0]) * (tlbrs2[j, 3] - tlbrs2[j, 1])
+                union_area = area1 + area2 - inter_area
+                
+                out[i, j] = inter_area / union_area if union_area > 0 else 0.0
+else:
+    iou_matrix_nb = None
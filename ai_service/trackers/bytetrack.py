@@ -6,13 +6,29 @@ Based on ByteTrack: Multi-Object Tracking by Associating Every Detection Box
 import numpy as np
 from collections import defaultdict
 from scipy.optimize import linear_sum_assignment
-from dataclasses import dataclass, field
+from enum import IntEnum
 from typing import List, Tuple, Optional
 import time
 
+from ._iou_numba import NUMBA_AVAILABLE, iou_matrix_nb
 
-@dataclass
-class TrackState:
+try:
+    import lap
+    LAP_AVAILABLE = True
+except ImportError:
+    LAP_AVAILABLE = False
+
+# Pair count above which the Numba kernel beats NumPy broadcasting
+NUMBA_IOU_MIN_PAIRS = 1024
+
+# Matrix side below which scipy's lower call overhead beats lap.lapjv
+LAPJV_MIN_SIZE = 8
+
+# Initial row count of the pooled per-frame detection bbox buffer
+DET_BBOX_POOL_SIZE = 512
+
+
+class TrackState(IntEnum):
     """Track state enumeration."""
     NEW = 0
     TRACKED = 1
@@ -20,44 +36,215 @@ class TrackState:
     REMOVED = 3
 
 
-@dataclass 
-class STrack:
-    """Single object tracking representation."""
+class TrackTable:
+    """
+    Structure-of-arrays storage for live track state.
     
-    track_id: int = 0
-    bbox: np.ndarray = field(default_factory=lambda: np.zeros(4))  # x1, y1, x2, y2
-    score: float = 0.0
-    class_id: int = 0
+    Rows hold each attached track's bbox, Kalman mean and covariance in
+    contiguous arrays so the tracker can predict, update and compute IoU
+    over many tracks with single vectorized operations.
+    """
     
-    # Kalman filter state
-    mean: np.ndarray = field(default_factory=lambda: np.zeros(8))
-    covariance: np.ndarray = field(default_factory=lambda: np.eye(8))
+    def __init__(self, capacity: int = 64):
+        self.bbox = np.zeros((capacity, 4))
+        self.mean = np.zeros((capacity, 8))
+        self.covariance = np.zeros((capacity, 8, 8))
+        self._free_rows = list(range(capacity - 1, -1, -1))
     
-    # Track management
-    state: int = TrackState.NEW
-    is_activated: bool = False
-    frame_id: int = 0
-    start_frame: int = 0
-    tracklet_len: int = 0
+    @property
+    def capacity(self) -> int:
+        return self.bbox.shape[0]
+    
+    def allocate(self) -> int:
+        """Reserve a row, growing the arrays when the free-list is empty."""
+        if not self._free_rows:
+            self._grow()
+        return self._free_rows.pop()
+    
+    def release(self, row: int):
+        """Return a row to the free-list."""
+        self._free_rows.append(row)
+    
+    def _grow(self):
+        old_capacity = self.capacity
+        new_capacity = old_capacity * 2
+        
+        self.bbox = np.concatenate([self.bbox, np.zeros((old_capacity, 4))])
+        self.mean = np.concatenate([self.mean, np.zeros((old_capacity, 8))])
+        self.covariance = np.concatenate([self.covariance, np.zeros((old_capacity, 8, 8))])
+        self._free_rows.extend(range(new_capacity - 1, old_capacity - 1, -1))
+
+
+class STrack:
+    """
+    Single object tracking representation.
     
-    # Additional data
-    features: Optional[np.ndarray] = None
-    student_id: Optional[str] = None
+    Detections carry their own bbox/mean/covariance arrays. Once a track is
+    attached to a TrackTable those attributes become views of its table row.
+    """
+    
+    __slots__ = (
+        'track_id', 'score', 'class_id',
+        '_table', 'row_idx', '_bbox', '_mean', '_covariance',
+        'state', 'is_activated', 'frame_id', 'start_frame', 'tracklet_len',
+        'features', 'student_id'
+    )
     
     _next_id: int = 0
     
-    def __post_init__(self):
+    def __init__(
+        self,
+        track_id: int = 0,
+        bbox: Optional[np.ndarray] = None,  # x1, y1, x2, y2
+        score: float = 0.0,
+        class_id: int = 0,
+        mean: Optional[np.ndarray] = None,
+        covariance: Optional[np.ndarray] = None,
+        state: int = TrackState.NEW,
+        is_activated: bool = False,
+        frame_id: int = 0,
+        start_frame: int = 0,
+        tracklet_len: int = 0,
+        features: Optional[np.ndarray] = None,
+        student_id: Optional[str] = None
+    ):
+        self.track_id = track_id
+        self.score = score
+        self.class_id = class_id
+        
+        # Kalman filter state (local until attached to a TrackTable)
+        self._table: Optional[TrackTable] = None
+        self.row_idx = -1
+        self._bbox = bbox if bbox is not None else np.zeros(4)
+        self._mean = mean if mean is not None else np.zeros(8)
+        self._covariance = covariance if covariance is not None else np.eye(8)
+        
+        # Track management
+        self.state = state
+        self.is_activated = is_activated
+        self.frame_id = frame_id
+        self.start_frame = start_frame
+        self.tracklet_len = tracklet_len
+        
+        # Additional data
+        self.features = features
+        self.student_id = student_id
+        
         if self.track_id == 0:
             STrack._next_id += 1
             self.track_id = STrack._next_id
     
+    @classmethod
+    def from_detection(
+        cls,
+        bbox: np.ndarray,
+        score: float,
+        class_id: int,
+        mean: np.ndarray,
+        covariance: np.ndarray,
+        features: Optional[np.ndarray] = None
+    ) -> 'STrack':
+        """
+        Build a detection-only STrack around existing state arrays.
+        
+        Skips the default array allocation and ID assignment of __init__;
+        track_id stays -1 until the detection is activated as a new track.
+        """
+        track = cls.__new__(cls)
+        track.track_id = -1
+        track.score = score
+        track.class_id = class_id
+        
+        track._table = None
+        track.row_idx = -1
+        track._bbox = bbox
+        track._mean = mean
+        track._covariance = covariance
+        
+        track.state = TrackState.NEW
+        track.is_activated = False
+        track.frame_id = 0
+        track.start_frame = 0
+        track.tracklet_len = 0
+        
+        track.features = features
+        track.student_id = None
+        return track
+    
     @staticmethod
     def reset_id():
         """Reset track ID counter."""
         STrack._next_id = 0
     
+    @property
+    def bbox(self) -> np.ndarray:
+        if self._table is not None:
+            return self._table.bbox[self.row_idx]
+        return self._bbox
+    
+    @bbox.setter
+    def bbox(self, value: np.ndarray):
+        if self._table is not None:
+            self._table.bbox[self.row_idx] = value
+        else:
+            self._bbox = value
+    
+    @property
+    def mean(self) -> np.ndarray:
+        if self._table is not None:
+            return self._table.mean[self.row_idx]
+        return self._mean
+    
+    @mean.setter
+    def mean(self, value: np.ndarray):
+        if self._table is not None:
+            self._table.mean[self.row_idx] = value
+        else:
+            self._mean = value
+    
+    @property
+    def covariance(self) -> np.ndarray:
+        if self._table is not None:
+            return self._table.covariance[self.row_idx]
+        return self._covariance
+    
+    @covariance.setter
+    def covariance(self, value: np.ndarray):
+        if self._table is not None:
+            self._table.covariance[self.row_idx] = value
+        else:
+            self._covariance = value
+    
+    def attach(self, table: TrackTable):
+        """Move bbox and Kalman state into a row of the given table."""
+        row = table.allocate()
+        table.bbox[row] = self._bbox
+        table.mean[row] = self._mean
+        table.covariance[row] = self._covariance
+        
+        self._table = table
+        self.row_idx = row
+        self._bbox = self._mean = self._covariance = None
+    
+    def detach(self):
+        """Copy state out of the table and release the row."""
+        if self._table is None:
+            return
+        
+        table = self._table
+        self._bbox = table.bbox[self.row_idx].copy()
+        self._mean = table.mean[self.row_idx].copy()
+        self._covariance = table.covariance[self.row_idx].copy()
+        
+        table.release(self.row_idx)
+        self._table = None
+        self.row_idx = -1
+    
     def activate(self, frame_id: int):
         """Activate a new track."""
+        if self.track_id < 0:
+            STrack._next_id += 1
+            self.track_id = STrack._next_id
         self.frame_id = frame_id
         self.start_frame = frame_id
         self.state = TrackState.TRACKED
@@ -111,9 +298,16 @@ class STrack:
     @property
     def center(self) -> Tuple[float, float]:
         """Get bbox center."""
+        bbox = self.bbox
+        return (
+            (bbox[0] + bbox[2]) / 2,
+            (bbox[1] + bbox[3]) / 2
+        )
+    
+    def __repr__(self) -> str:
         return (
-            (self.bbox[0] + self.bbox[2]) / 2,
-            (self.bbox[1] + self.bbox[3]) / 2
+            f"STrack(track_id={self.track_id}, bbox={self.bbox!r}, "
+            f"score={self.score}, state={self.state})"
         )
 
 
@@ -138,65 +332,101 @@ class KalmanFilter:
         self._std_weight_velocity = 1.0 / 160
     
     def initiate(self, measurement: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-        """Initialize track from first detection."""
+        """
+        Initialize track from first detection.
+        
+        Accepts a single (4,) measurement or stacked (K, 4) measurements.
+        """
         mean_pos = measurement
         mean_vel = np.zeros_like(mean_pos)
-        mean = np.concatenate([mean_pos, mean_vel])
-        
-        std = [
-            2 * self._std_weight_position * measurement[2],
-            2 * self._std_weight_position * measurement[3],
-            2 * self._std_weight_position * measurement[2],
-            2 * self._std_weight_position * measurement[3],
-            10 * self._std_weight_velocity * measurement[2],
-            10 * self._std_weight_velocity * measurement[3],
-            10 * self._std_weight_velocity * measurement[2],
-            10 * self._std_weight_velocity * measurement[3]
-        ]
-        covariance = np.diag(np.square(std))
+        mean = np.concatenate([mean_pos, mean_vel], axis=-1)
+        
+        wh = measurement[..., 2:4]
+        std = np.concatenate([
+            2 * self._std_weight_position * wh,
+            2 * self._std_weight_position * wh,
+            10 * self._std_weight_velocity * wh,
+            10 * self._std_weight_velocity * wh
+        ], axis=-1)
+        covariance = np.einsum('...i,ij->...ij', np.square(std), np.eye(8))
         
         return mean, covariance
     
     def predict(self, mean: np.ndarray, covariance: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-        """Run Kalman filter prediction step."""
-        std = [
-            self._std_weight_position * mean[2],
-            self._std_weight_position * mean[3],
-            self._std_weight_position * mean[2],
-            self._std_weight_position * mean[3],
-            self._std_weight_velocity * mean[2],
-            self._std_weight_velocity * mean[3],
-            self._std_weight_velocity * mean[2],
-            self._std_weight_velocity * mean[3]
-        ]
-        motion_cov = np.diag(np.square(std))
-        
-        mean = self._motion_mat @ mean
-        covariance = self._motion_mat @ covariance @ self._motion_mat.T + motion_cov
+        """
+        Run Kalman filter prediction step.
         
-        return mean, covariance
+        Accepts a single (8,) state or stacked (K, 8) states. The motion
+        model is identity plus dt on the position/velocity super-diagonal,
+        so it is applied block-wise instead of with 8x8 matmuls.
+        """
+        wh = mean[..., 2:4]
+        std = np.concatenate([
+            self._std_weight_position * wh,
+            self._std_weight_position * wh,
+            self._std_weight_velocity * wh,
+            self._std_weight_velocity * wh
+        ], axis=-1)
+        
+        dt = self.dt
+        new_mean = mean.copy()
+        new_mean[..., :4] += dt * mean[..., 4:]
+        
+        pos_pos = covariance[..., :4, :4]
+        pos_vel = covariance[..., :4, 4:]
+        vel_pos = covariance[..., 4:, :4]
+        vel_vel = covariance[..., 4:, 4:]
+        
+        new_covariance = np.empty_like(covariance)
+        new_covariance[..., :4, :4] = pos_pos + dt * (pos_vel + vel_pos) + dt * dt * vel_vel
+        new_covariance[..., :4, 4:] = pos_vel + dt * vel_vel
+        new_covariance[..., 4:, :4] = vel_pos + dt * vel_vel
+        new_covariance[..., 4:, 4:] = vel_vel
+        
+        # Add diagonal process noise
+        diag = np.arange(8)
+        new_covariance[..., diag, diag] += np.square(std)
+        
+        return new_mean, new_covariance
+    
+    def multi_predict(self, mean: np.ndarray, covariance: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Run Kalman filter prediction step for (K, 8) means and (K, 8, 8) covariances."""
+        return self.predict(mean, covariance)
     
     def update(self, mean: np.ndarray, covariance: np.ndarray, 
                measurement: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-        """Run Kalman filter update step."""
-        std = [
-            self._std_weight_position * mean[2],
-            self._std_weight_position * mean[3],
-            self._std_weight_position * mean[2],
-            self._std_weight_position * mean[3]
-        ]
-        innovation_cov = np.diag(np.square(std))
-        
-        projected_mean = self._update_mat @ mean
-        projected_cov = self._update_mat @ covariance @ self._update_mat.T + innovation_cov
-        
-        kalman_gain = covariance @ self._update_mat.T @ np.linalg.inv(projected_cov)
+        """
+        Run Kalman filter update step.
+        
+        Accepts a single (8,) state or stacked (K, 8) states. The observation
+        model selects the first 4 state entries, so projections are slices.
+        """
+        wh = mean[..., 2:4]
+        std = np.concatenate([
+            self._std_weight_position * wh,
+            self._std_weight_position * wh
+        ], axis=-1)
+        
+        projected_mean = mean[..., :4]
+        projected_cov = covariance[..., :4, :4].copy()
+        diag = np.arange(4)
+        projected_cov[..., diag, diag] += np.square(std)
+        
+        # K = P H^T S^-1, solved rather than inverted (P and S are symmetric)
+        kalman_gain = np.swapaxes(
+            np.linalg.solve(projected_cov, covariance[..., :4, :]), -1, -2
+        )
         innovation = measurement - projected_mean
         
-        new_mean = mean + kalman_gain @ innovation
-        new_covariance = covariance - kalman_gain @ self._update_mat @ covariance
+        new_mean = mean + (kalman_gain @ innovation[..., None])[..., 0]
+        new_covariance = covariance - kalman_gain @ covariance[..., :4, :]
         
         return new_mean, new_covariance
+    
+    def multi_update(self, mean: np.ndarray, covariance: np.ndarray,
+                     measurement: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Run Kalman filter update step for (K, 8) means against (K, 4) measurements."""
+        return self.update(mean, covariance, measurement)
 
 
 def bbox_iou(bbox1: np.ndarray, bbox2: np.ndarray) -> float:
@@ -216,18 +446,80 @@ def bbox_iou(bbox1: np.ndarray, bbox2: np.ndarray) -> float:
     return inter_area / union_area if union_area > 0 else 0
 
 
-def iou_distance(tracks: List[STrack], detections: List[STrack]) -> np.ndarray:
-    """Calculate IoU distance matrix between tracks and detections."""
+def bbox_areas(tlbrs: np.ndarray) -> np.ndarray:
+    """Calculate areas of an (N, 4) tlbr array."""
+    return (tlbrs[:, 2] - tlbrs[:, 0]) * (tlbrs[:, 3] - tlbrs[:, 1])
+
+
+def bbox_ious(
+    tlbrs1: np.ndarray,
+    tlbrs2: np.ndarray,
+    areas1: Optional[np.ndarray] = None,
+    areas2: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Calculate pairwise IoU matrix between two (N, 4) and (M, 4) tlbr arrays.
+    
+    Precomputed box areas may be passed to skip recomputing them.
+    """
+    tlbrs1 = np.asarray(tlbrs1, dtype=np.float64).reshape(-1, 4)
+    tlbrs2 = np.asarray(tlbrs2, dtype=np.float64).reshape(-1, 4)
+    
+    x1 = np.maximum(tlbrs1[:, None, 0], tlbrs2[None, :, 0])
+    y1 = np.maximum(tlbrs1[:, None, 1], tlbrs2[None, :, 1])
+    x2 = np.minimum(tlbrs1[:, None, 2], tlbrs2[None, :, 2])
+    y2 = np.minimum(tlbrs1[:, None, 3], tlbrs2[None, :, 3])
+    
+    # Branchless clip, reusing the corner buffers for the overlap extents
+    inter_w = np.maximum(np.subtract(x2, x1, out=x2), 0, out=x2)
+    inter_h = np.maximum(np.subtract(y2, y1, out=y2), 0, out=y2)
+    inter_area = np.multiply(inter_w, inter_h, out=x1)
+    
+    if areas1 is None:
+        areas1 = bbox_areas(tlbrs1)
+    if areas2 is None:
+        areas2 = bbox_areas(tlbrs2)
+    
+    union_area = areas1[:, None] + areas2[None, :] - inter_area
+    
+    return np.divide(
+        inter_area, union_area,
+        out=np.zeros_like(inter_area),
+        where=union_area > 0
+    )
+
+
+def _stack_tlbrs(items) -> np.ndarray:
+    """Get an (N, 4) tlbr array from STracks or an existing bbox array."""
+    if isinstance(items, np.ndarray):
+        return items
+    return np.array([item.bbox for item in items], dtype=np.float64).reshape(-1, 4)
+
+
+def iou_distance(
+    tracks,
+    detections,
+    track_areas: Optional[np.ndarray] = None,
+    det_areas: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Calculate IoU distance matrix between tracks and detections.
+    
+    Both sides may be lists of STrack or (N, 4) tlbr arrays (e.g. TrackTable rows),
+    optionally with their precomputed box areas.
+    """
     if len(tracks) == 0 or len(detections) == 0:
         return np.zeros((len(tracks), len(detections)))
     
-    cost_matrix = np.zeros((len(tracks), len(detections)))
+    track_tlbrs = _stack_tlbrs(tracks)
+    det_tlbrs = _stack_tlbrs(detections)
     
-    for i, track in enumerate(tracks):
-        for j, det in enumerate(detections):
-            cost_matrix[i, j] = 1 - bbox_iou(track.tlbr, det.tlbr)
+    if NUMBA_AVAILABLE and len(tracks) * len(detections) > NUMBA_IOU_MIN_PAIRS:
+        ious = np.empty((len(tracks), len(detections)))
+        iou_matrix_nb(track_tlbrs, det_tlbrs, ious)
+        return 1 - ious
     
-    return cost_matrix
+    return 1 - bbox_ious(track_tlbrs, det_tlbrs, track_areas, det_areas)
 
 
 def linear_assignment(cost_matrix: np.ndarray, thresh: float) -> Tuple[List, List, List]:
@@ -235,19 +527,28 @@ def linear_assignment(cost_matrix: np.ndarray, thresh: float) -> Tuple[List, Lis
     if cost_matrix.size == 0:
         return [], list(range(cost_matrix.shape[0])), list(range(cost_matrix.shape[1]))
     
+    if LAP_AVAILABLE and min(cost_matrix.shape) >= LAPJV_MIN_SIZE:
+        # Gate inside the solver: pairs costing more than thresh stay unassigned
+        _, x, y = lap.lapjv(cost_matrix, extend_cost=True, cost_limit=thresh)
+        matches = [(row, int(col)) for row, col in enumerate(x) if col >= 0]
+        unmatched_tracks = np.flatnonzero(x < 0).tolist()
+        unmatched_dets = np.flatnonzero(y < 0).tolist()
+        return matches, unmatched_tracks, unmatched_dets
+    
     row_indices, col_indices = linear_sum_assignment(cost_matrix)
     
-    matches = []
-    unmatched_tracks = list(range(cost_matrix.shape[0]))
-    unmatched_dets = list(range(cost_matrix.shape[1]))
+    valid = cost_matrix[row_indices, col_indices] < thresh
+    matched_rows = row_indices[valid]
+    matched_cols = col_indices[valid]
     
-    for row, col in zip(row_indices, col_indices):
-        if cost_matrix[row, col] < thresh:
-            matches.append((row, col))
-            if row in unmatched_tracks:
-                unmatched_tracks.remove(row)
-            if col in unmatched_dets:
-                unmatched_dets.remove(col)
+    row_matched = np.zeros(cost_matrix.shape[0], dtype=bool)
+    col_matched = np.zeros(cost_matrix.shape[1], dtype=bool)
+    row_matched[matched_rows] = True
+    col_matched[matched_cols] = True
+    
+    matches = list(zip(matched_rows.tolist(), matched_cols.tolist()))
+    unmatched_tracks = np.flatnonzero(~row_matched).tolist()
+    unmatched_dets = np.flatnonzero(~col_matched).tolist()
     
     return matches, unmatched_tracks, unmatched_dets
 
@@ -271,6 +572,10 @@ class ByteTracker:
         self.min_box_area = min_box_area
         
         self.kalman_filter = KalmanFilter()
+        self.table = TrackTable()
+        
+        # Per-frame detection bbox pool; detection STracks hold row views into it
+        self._det_bbox_buf = np.empty((DET_BBOX_POOL_SIZE, 4))
         
         self.tracked_tracks: List[STrack] = []
         self.lost_tracks: List[STrack] = []
@@ -283,9 +588,27 @@ class ByteTracker:
         self.tracked_tracks = []
         self.lost_tracks = []
         self.removed_tracks = []
+        self.table = TrackTable()
         self.frame_id = 0
         STrack.reset_id()
     
+    def _associate(
+        self,
+        rows: np.ndarray,
+        det_tlbrs: np.ndarray,
+        track_areas: np.ndarray,
+        det_areas: np.ndarray,
+        thresh: float
+    ) -> Tuple[List, List, List]:
+        """IoU association of table rows against detection boxes."""
+        if len(rows) == 0 or len(det_tlbrs) == 0:
+            return [], list(range(len(rows))), list(range(len(det_tlbrs)))
+        
+        cost_matrix = iou_distance(
+            self.table.bbox[rows], det_tlbrs, track_areas[rows], det_areas
+        )
+        return linear_assignment(cost_matrix, thresh)
+    
     def update(self, detections: List[dict]) -> List[STrack]:
         """
         Update tracker with new detections.
@@ -302,87 +625,107 @@ class ByteTracker:
         """
         self.frame_id += 1
         
-        # Filter small detections
-        valid_dets = []
-        for det in detections:
-            bbox = np.array(det['bbox'])
-            area = (bbox[2] - bbox[0]) * (bbox[3] - bbox[1])
-            if area >= self.min_box_area:
-                valid_dets.append(det)
+        # Fill the pooled bbox buffer (grown on demand)
+        num_dets = len(detections)
+        if num_dets > len(self._det_bbox_buf):
+            self._det_bbox_buf = np.empty((max(num_dets, 2 * len(self._det_bbox_buf)), 4))
+        bboxes = self._det_bbox_buf[:num_dets]
+        for i, det in enumerate(detections):
+            bboxes[i] = det['bbox']
+        
+        # Filter small detections and initialize Kalman state in one pass
+        wh = bboxes[:, 2:] - bboxes[:, :2]
+        keep = np.flatnonzero(wh[:, 0] * wh[:, 1] >= self.min_box_area)
+        
+        kept = bboxes[keep]
+        measurements = np.concatenate([(kept[:, :2] + kept[:, 2:]) / 2, wh[keep]], axis=1)
+        means, covariances = self.kalman_filter.initiate(measurements)
         
         # Separate high and low confidence detections
         high_dets = []
         low_dets = []
+        high_idx = []
+        low_idx = []
         
-        for det in valid_dets:
-            track = STrack(
-                bbox=np.array(det['bbox']),
+        for i, det_idx in enumerate(keep.tolist()):
+            det = detections[det_idx]
+            track = STrack.from_detection(
+                bbox=bboxes[det_idx],
                 score=det['score'],
                 class_id=det.get('class_id', 0),
+                mean=means[i],
+                covariance=covariances[i],
                 features=det.get('features')
             )
             
-            # Initialize Kalman filter
-            cx = (det['bbox'][0] + det['bbox'][2]) / 2
-            cy = (det['bbox'][1] + det['bbox'][3]) / 2
-            w = det['bbox'][2] - det['bbox'][0]
-            h = det['bbox'][3] - det['bbox'][1]
-            measurement = np.array([cx, cy, w, h])
-            track.mean, track.covariance = self.kalman_filter.initiate(measurement)
-            
             if det['score'] >= self.track_thresh:
                 high_dets.append(track)
+                high_idx.append(det_idx)
             else:
                 low_dets.append(track)
+                low_idx.append(det_idx)
         
-        # Predict track positions
-        for track in self.tracked_tracks:
-            track.mean, track.covariance = self.kalman_filter.predict(
-                track.mean, track.covariance
-            )
-            # Update bbox from predicted state
-            cx, cy, w, h = track.mean[:4]
-            track.bbox = np.array([cx - w/2, cy - h/2, cx + w/2, cy + h/2])
+        table = self.table
+        previous_tracks = self.tracked_tracks + self.lost_tracks
         
-        for track in self.lost_tracks:
-            track.mean, track.covariance = self.kalman_filter.predict(
-                track.mean, track.covariance
+        # Predict track positions (batched over tracked and lost tracks)
+        if previous_tracks:
+            rows = np.array([t.row_idx for t in previous_tracks])
+            table.mean[rows], table.covariance[rows] = self.kalman_filter.multi_predict(
+                table.mean[rows], table.covariance[rows]
             )
         
+        # Update tracked bboxes from predicted state
+        if self.tracked_tracks:
+            rows = np.array([t.row_idx for t in self.tracked_tracks])
+            center = table.mean[rows, :2]
+            half_wh = table.mean[rows, 2:4] * 0.5
+            table.bbox[rows] = np.concatenate([center - half_wh, center + half_wh], axis=1)
+        
+        # Box areas, computed once and shared by all three associations
+        track_areas = bbox_areas(table.bbox)
+        high_tlbrs = bboxes[np.array(high_idx, dtype=int)]
+        low_tlbrs = bboxes[np.array(low_idx, dtype=int)]
+        high_areas = bbox_areas(high_tlbrs)
+        low_areas = bbox_areas(low_tlbrs)
+        
         # === First association with high confidence detections ===
         unconfirmed = [t for t in self.tracked_tracks if not t.is_activated]
         tracked = [t for t in self.tracked_tracks if t.is_activated]
         
         # Associate tracked tracks with high confidence detections
-        cost_matrix = iou_distance(tracked, high_dets)
-        matches, unmatched_tracks, unmatched_dets = linear_assignment(
-            cost_matrix, self.match_thresh
+        tracked_rows = np.array([t.row_idx for t in tracked], dtype=int)
+        matches, unmatched_tracks, unmatched_dets = self._associate(
+            tracked_rows, high_tlbrs, track_areas, high_areas, self.match_thresh
         )
         
-        # Update matched tracks
-        for track_idx, det_idx in matches:
-            track = tracked[track_idx]
-            det = high_dets[det_idx]
+        # Update matched tracks (batched Kalman update)
+        if matches:
+            matched_tracks = [tracked[track_idx] for track_idx, _ in matches]
+            matched_dets = [high_dets[det_idx] for _, det_idx in matches]
             
-            # Kalman update
-            cx = (det.bbox[0] + det.bbox[2]) / 2
-            cy = (det.bbox[1] + det.bbox[3]) / 2
-            w = det.bbox[2] - det.bbox[0]
-            h = det.bbox[3] - det.bbox[1]
-            measurement = np.array([cx, cy, w, h])
-            track.mean, track.covariance = self.kalman_filter.update(
-                track.mean, track.covariance, measurement
+            det_bboxes = np.array([det.bbox for det in matched_dets])
+            measurements = np.concatenate([
+                (det_bboxes[:, :2] + det_bboxes[:, 2:]) / 2,
+                det_bboxes[:, 2:] - det_bboxes[:, :2]
+            ], axis=1)
+            rows = np.array([t.row_idx for t in matched_tracks])
+            table.mean[rows], table.covariance[rows] = self.kalman_filter.multi_update(
+                table.mean[rows], table.covariance[rows], measurements
             )
             
-            track.update(det, self.frame_id)
+            for track, det in zip(matched_tracks, matched_dets):
+                track.update(det, self.frame_id)
         
         # Remaining high confidence detections and unmatched tracks
         remaining_tracked = [tracked[i] for i in unmatched_tracks]
         remaining_high_dets = [high_dets[i] for i in unmatched_dets]
         
         # === Second association with low confidence detections ===
-        cost_matrix = iou_distance(remaining_tracked, low_dets)
-        matches, unmatched_tracks_2, _ = linear_assignment(cost_matrix, 0.5)
+        remaining_rows = tracked_rows[np.array(unmatched_tracks, dtype=int)]
+        matches, unmatched_tracks_2, _ = self._associate(
+            remaining_rows, low_tlbrs, track_areas, low_areas, 0.5
+        )
         
         for track_idx, det_idx in matches:
             track = remaining_tracked[track_idx]
@@ -397,8 +740,12 @@ class ByteTracker:
                 self.lost_tracks.append(track)
         
         # === Third association: lost tracks with remaining high detections ===
-        cost_matrix = iou_distance(self.lost_tracks, remaining_high_dets)
-        matches, unmatched_lost, unmatched_high = linear_assignment(cost_matrix, 0.7)
+        lost_rows = np.array([t.row_idx for t in self.lost_tracks], dtype=int)
+        remaining_high_idx = np.array(unmatched_dets, dtype=int)
+        matches, unmatched_lost, unmatched_high = self._associate(
+            lost_rows, high_tlbrs[remaining_high_idx],
+            track_areas, high_areas[remaining_high_idx], 0.7
+        )
         
         for track_idx, det_idx in matches:
             track = self.lost_tracks[track_idx]
@@ -406,14 +753,13 @@ class ByteTracker:
             track.re_activate(det, self.frame_id)
         
         # Remove lost tracks that exceeded buffer
-        removed_lost = []
         for track in self.lost_tracks:
             if self.frame_id - track.frame_id > self.track_buffer:
                 track.mark_removed()
-                removed_lost.append(track)
         
+        # mark_removed() moves the state off LOST, so the state check suffices
         self.lost_tracks = [t for t in self.lost_tracks 
-                           if t.state == TrackState.LOST and t not in removed_lost]
+                           if t.state == TrackState.LOST]
         
         # === Initialize new tracks from unmatched high confidence detections ===
         new_tracks = []
@@ -421,6 +767,7 @@ class ByteTracker:
             det = remaining_high_dets[idx]
             if det.score >= self.track_thresh:
                 det.activate(self.frame_id)
+                det.attach(table)
                 new_tracks.append(det)
         
         # Update track lists
@@ -428,6 +775,13 @@ class ByteTracker:
                               if t.state == TrackState.TRACKED]
         self.tracked_tracks.extend(new_tracks)
         
+        # Release table rows of tracks that left both lists
+        live_ids = {id(t) for t in self.tracked_tracks}
+        live_ids.update(id(t) for t in self.lost_tracks)
+        for track in previous_tracks:
+            if id(track) not in live_ids:
+                track.detach()
+        
         # Return all active tracks
         active_tracks = [t for t in self.tracked_tracks if t.is_activated]
         
@@ -5,12 +5,14 @@ This runs the emotion detection locally without needing Google Colab.
 
 import os
 import cv2
+import threading
 import base64
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
 import torch
-from torchvision import models, transforms
+from torchvision import models
 
 # Try to import DeepFace (main emotion detection)
 try:
@@ -34,19 +36,39 @@ except ImportError:
 app = Flask(__name__, static_folder='static')
 CORS(app)  # Enable CORS for frontend communication
 
+# Worker pool for audio preprocessing (the spectrogram runs in C and releases
+# the GIL, so it overlaps with image decoding and emotion analysis)
+preprocess_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='preprocess')
+
 # Emotion labels
 emotion_labels = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
 focus_labels = ['focused', 'distracted', 'bored', 'engaged']
 
-# Audio model setup (pretrained VGG16 for audio features)
-print("Loading audio model...")
-try:
-    audio_model = models.vgg16(weights=models.VGG16_Weights.DEFAULT)
-    audio_model.eval()
-    print("✅ Audio model loaded")
-except Exception as e:
-    audio_model = None
-    print(f"⚠️ Audio model not loaded: {e}")
+# Audio model setup (pretrained VGG16 for audio features).
+# Its output does not feed the engagement scores yet, so it is opt-in.
+AUDIO_MODEL_ENABLED = os.environ.get('AUDIO_MODEL_ENABLED', '0').lower() in ('1', 'true', 'yes')
+
+audio_model = None
+if AUDIO_MODEL_ENABLED:
+    print("Loading audio model...")
+    try:
+        audio_model = models.vgg16(weights=models.VGG16_Weights.DEFAULT)
+        audio_model.eval()
+        # Dynamic int8 quantization of the (dominant) classifier Linear layers
+        audio_model = torch.ao.quantization.quantize_dynamic(
+            audio_model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        print("✅ Audio model loaded")
+    except Exception as e:
+        audio_model = None
+        print(f"⚠️ Audio model not loaded: {e}")
+else:
+    print("ℹ️ Audio model disabled (set AUDIO_MODEL_ENABLED=1 to enable)")
+
+
+# ImageNet normalization for the VGG input, shaped to broadcast over (C, H, W)
+AUDIO_MEAN = torch.tensor([0.485, 0.456, 0.406]).view(3, 1, 1)
+AUDIO_STD = torch.tensor([0.229, 0.224, 0.225]).view(3, 1, 1)
 
 
 def preprocess_audio(audio_data, sr=44100):
@@ -67,28 +89,89 @@ def preprocess_audio(audio_data, sr=44100):
         S_dB = librosa.power_to_db(S, ref=np.max)
         
         # Resize to match VGG input
-        img = cv2.resize(S_dB, (224, 224))
-        img = np.stack([img] * 3, axis=-1)  # Convert to 3 channels
-        
-        # Convert to tensor
-        transform = transforms.Compose([
-            transforms.ToTensor(),
-            transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
-        ])
-        img_tensor = transform(img).unsqueeze(0)
-        return img_tensor
+        img = cv2.resize(S_dB.astype(np.float32), (224, 224))
+        img = cv2.cvtColor(img, cv2.COLOR_GRAY2RGB)  # Convert to 3 channels
+        
+        # Convert to normalized (1, 3, H, W) tensor in place
+        img_tensor = torch.from_numpy(img).permute(2, 0, 1)
+        img_tensor.sub_(AUDIO_MEAN).div_(AUDIO_STD)
+        return img_tensor.unsqueeze_(0)
     except Exception as e:
         print(f"Audio preprocessing error: {e}")
         return None
 
 
+# Fallback face detector, parsed from disk once at import
+face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+
+# Fallback detection runs on frames downscaled to at most this width
+FALLBACK_MAX_WIDTH = 320
+
+# Optional SSD ResNet-10 face detector used to gate DeepFace (Haar cascade otherwise)
+FACE_DETECTOR_PROTO = os.environ.get('FACE_DETECTOR_PROTO', 'models/deploy.prototxt')
+FACE_DETECTOR_MODEL = os.environ.get(
+    'FACE_DETECTOR_MODEL', 'models/res10_300x300_ssd_iter_140000.caffemodel'
+)
+FACE_CONFIDENCE = 0.5
+
+face_net = None
+# setInput()/forward() keep per-net state, and Flask serves requests on
+# several threads, so the shared net is used by one request at a time
+face_net_lock = threading.Lock()
+if os.path.exists(FACE_DETECTOR_PROTO) and os.path.exists(FACE_DETECTOR_MODEL):
+    try:
+        face_net = cv2.dnn.readNetFromCaffe(FACE_DETECTOR_PROTO, FACE_DETECTOR_MODEL)
+        print("✅ SSD face detector loaded")
+    except cv2.error as e:
+        print(f"⚠️ SSD face detector not loaded: {e}")
+
+
+# Decode frames at half resolution (JPEG DCT scaling); off by default since
+# DeepFace wants faces of roughly 224px or more
+DECODE_HALF_RES = os.environ.get('DECODE_HALF_RES', '0').lower() in ('1', 'true', 'yes')
+DECODE_FLAGS = cv2.IMREAD_REDUCED_COLOR_2 if DECODE_HALF_RES else cv2.IMREAD_COLOR
+
+
+def decode_image(image_data):
+    """Decode a base64 (optionally data-URL prefixed) image to a BGR array."""
+    if ',' in image_data:
+        image_data = image_data.split(',', 1)[1]  # Remove data URL prefix
+    
+    # frombuffer wraps the decoded bytes without copying
+    nparr = np.frombuffer(base64.b64decode(image_data), np.uint8)
+    return cv2.imdecode(nparr, DECODE_FLAGS)
+
+
+def detect_faces(img):
+    """Detect faces, returning (x, y, w, h) boxes in full-frame coordinates."""
+    h, w = img.shape[:2]
+    
+    if face_net is not None:
+        blob = cv2.dnn.blobFromImage(
+            cv2.resize(img, (300, 300)), 1.0, (300, 300), (104.0, 177.0, 123.0)
+        )
+        with face_net_lock:
+            face_net.setInput(blob)
+            detections = face_net.forward()[0, 0]
+        detections = detections[detections[:, 2] > FACE_CONFIDENCE]
+        
+        boxes = np.clip(detections[:, 3:7] * [w, h, w, h], 0, [w, h, w, h]).astype(int)
+        return [(x1, y1, x2 - x1, y2 - y1) for x1, y1, x2, y2 in boxes if x2 > x1 and y2 > y1]
+    
+    # Haar cascade (cost is ~linear in pixels, so downscale)
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    scale = 1.0
+    if w > FALLBACK_MAX_WIDTH:
+        scale = FALLBACK_MAX_WIDTH / w
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    faces = face_cascade.detectMultiScale(gray, 1.1, 4)
+    return [tuple(int(v / scale) for v in face) for face in faces]
+
+
 def analyze_emotion_fallback(img):
     """Fallback emotion detection using OpenCV face detection."""
     try:
-        # Use OpenCV's face detection
-        face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, 1.1, 4)
+        faces = detect_faces(img)
         
         if len(faces) > 0:
             # Face detected - return neutral with some variation
@@ -118,14 +201,14 @@ def analyze():
     try:
         data = request.json
         
-        # Process image
-        image_data = data.get('image', '')
-        if ',' in image_data:
-            image_data = image_data.split(',')[1]  # Remove data URL prefix
+        # Build the audio spectrogram in the background while the image is
+        # decoded and analyzed here (decoding alone isn't worth a thread handoff)
+        audio_data = data.get('audio', [])
+        audio_future = None
+        if audio_data and audio_model is not None and LIBROSA_AVAILABLE:
+            audio_future = preprocess_executor.submit(preprocess_audio, audio_data)
         
-        # Decode base64 image
-        nparr = np.frombuffer(base64.b64decode(image_data), np.uint8)
-        img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        img = decode_image(data.get('image', ''))
         
         if img is None:
             return jsonify({"error": "Invalid image data"}), 400
@@ -136,15 +219,20 @@ def analyze():
         
         if DEEPFACE_AVAILABLE:
             try:
-                face_analysis = DeepFace.analyze(
-                    img, 
-                    actions=['emotion'],
-                    enforce_detection=False,  # Don't fail if no face detected
-                    silent=True
-                )
-                if isinstance(face_analysis, list) and len(face_analysis) > 0:
-                    dominant_emotion = face_analysis[0]['dominant_emotion']
-                    emotion_scores = face_analysis[0]['emotion']
+                # Cheap face pre-filter: frames without a face skip DeepFace entirely
+                faces = detect_faces(img)
+                if len(faces) > 0:
+                    x, y, w, h = max(faces, key=lambda f: f[2] * f[3])
+                    face_analysis = DeepFace.analyze(
+                        img[y:y + h, x:x + w],
+                        actions=['emotion'],
+                        enforce_detection=False,  # Don't fail if no face detected
+                        detector_backend='skip',  # Already cropped to the face
+                        silent=True
+                    )
+                    if isinstance(face_analysis, list) and len(face_analysis) > 0:
+                        dominant_emotion = face_analysis[0]['dominant_emotion']
+                        emotion_scores = face_analysis[0]['emotion']
             except Exception as e:
                 print(f"DeepFace error: {e}")
                 # Use fallback
@@ -158,11 +246,10 @@ def analyze():
             emotion_scores = fallback['emotion']
         
         # Process audio if available
-        audio_data = data.get('audio', [])
-        if audio_data and audio_model is not None and LIBROSA_AVAILABLE:
-            audio_tensor = preprocess_audio(audio_data)
+        if audio_future is not None:
+            audio_tensor = audio_future.result()
             if audio_tensor is not None:
-                with torch.no_grad():
+                with torch.inference_mode():
                     audio_features = audio_model(audio_tensor)
                     # Could use audio features to modify emotion scores
         
@@ -215,7 +302,8 @@ def health():
         "status": "running",
         "deepface": DEEPFACE_AVAILABLE,
         "librosa": LIBROSA_AVAILABLE,
-        "audio_model": audio_model is not None
+        "audio_model": audio_model is not None,
+        "face_detector": "ssd" if face_net is not None else "haar"
     })
 
 
@@ -3,27 +3,158 @@ AI Classroom Monitoring System
 Detects student engagement, attention, and emotions in real-time.
 
 Uses only OpenCV - no external ML dependencies needed!
+
+For production, serve with a WSGI server instead of the dev server:
+    gunicorn -k gthread -w 4 --threads 4 --preload classroom_monitor:app
+(--preload imports the app once in the master. Every cascade runs on the
+long-lived cascade_executor workers, each of which parses its own copy once
+and reuses it across requests; request threads never load cascades.)
 """
 
 import cv2
 import numpy as np
 import base64
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
-from collections import deque
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+import threading
 import time
 import os
 
+# Try to import orjson (faster JSON encode/decode for /analyze)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Let detectMultiScale's parallel_for_ use every core (override with CV_THREADS)
+cv2.setUseOptimized(True)
+cv2.setNumThreads(int(os.environ.get('CV_THREADS', os.cpu_count() or 1)))
+
+# Run the face cascade through OpenCL (T-API) on a GPU/iGPU when one is present;
+# CV_OPENCL=0 keeps it on the CPU
+USE_OPENCL = os.environ.get('CV_OPENCL', '1') != '0' and cv2.ocl.haveOpenCL()
+cv2.ocl.setUseOpenCL(USE_OPENCL)
+
 # Initialize Flask
 app = Flask(__name__, static_folder='static')
 CORS(app)
 
-# Load OpenCV's pre-trained detectors
-face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-eye_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_eye.xml')
-smile_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_smile.xml')
+# Load OpenCV's pre-trained detectors. The LBP face cascade is much cheaper per
+# window than Haar but isn't bundled with opencv-python, so fall back if missing.
+LBP_FACE_CASCADE = os.environ.get(
+    'LBP_FACE_CASCADE', cv2.data.haarcascades + 'lbpcascade_frontalface_improved.xml'
+)
+if os.path.exists(LBP_FACE_CASCADE) and cv2.CascadeClassifier().load(LBP_FACE_CASCADE):
+    FACE_CASCADE_PATH = LBP_FACE_CASCADE
+    FACE_CASCADE_TYPE = 'lbp'
+else:
+    FACE_CASCADE_PATH = cv2.data.haarcascades + 'haarcascade_frontalface_default.xml'
+    FACE_CASCADE_TYPE = 'haar'
+EYE_CASCADE_PATH = cv2.data.haarcascades + 'haarcascade_eye.xml'
+SMILE_CASCADE_PATH = cv2.data.haarcascades + 'haarcascade_smile.xml'
+
+# Optional CNN face detector (YuNet int8 ONNX on OpenCV DNN), preferred over the
+# face cascade when its model file is present. Eye/smile cascades still run:
+# YuNet's eye landmarks can't tell open eyes from closed ones.
+YUNET_MODEL = os.environ.get('YUNET_MODEL', 'models/face_detection_yunet_2023mar_int8.onnx')
+YUNET_SCORE_THRESHOLD = 0.7
+YUNET_AVAILABLE = hasattr(cv2, 'FaceDetectorYN') and os.path.exists(YUNET_MODEL)
+if YUNET_AVAILABLE:
+    FACE_CASCADE_TYPE = 'yunet'
+
+print(f"✅ OpenCV Face ({FACE_CASCADE_TYPE})/Eye/Smile detectors found")
+
+# Face detection runs on frames downscaled to at most this width
+DETECTION_WIDTH = 480
+MIN_FACE_SIZE = 60
+
+# Pyramid step and largest face as a fraction of the frame. No cap by default,
+# since a single webcam user's face can fill most of the frame; deployments
+# that only see distant classroom faces can lower it (e.g. 0.33) to skip the
+# largest scales
+FACE_SCALE_FACTOR = float(os.environ.get('FACE_SCALE_FACTOR', 1.2))
+MAX_FACE_FRACTION = float(os.environ.get('MAX_FACE_FRACTION', 1.0))
+
+# Decode frames at half resolution (JPEG DCT scaling); opt-in since small,
+# distant faces fall below the detector's minimum size sooner
+DECODE_HALF_RES = os.environ.get('DECODE_HALF_RES', '0').lower() in ('1', 'true', 'yes')
+DECODE_FLAGS = cv2.IMREAD_REDUCED_COLOR_2 if DECODE_HALF_RES else cv2.IMREAD_COLOR
+DECODE_SCALE = 2 if DECODE_HALF_RES else 1
+
+# Frames whose average hash differs from the previous one by fewer bits than
+# this reuse its analysis (webcams send many near-identical frames). Reuse
+# stops after FRAME_CACHE_MAX_AGE seconds, since closing eyes or turning heads
+# barely moves the hash of a near-static classroom frame.
+FRAME_HASH_MAX_DISTANCE = 4
+FRAME_CACHE_MAX_AGE = float(os.environ.get('FRAME_CACHE_MAX_AGE', 1.0))
+
+# (hash, results, analysis time) of the last analyzed frame; replaced as a
+# single tuple
+_last_frame = None
+
+# Smile check: 'cascade' (smile cascade) or 'edges' (mouth-region edge density,
+# far cheaper; the threshold should be calibrated for the camera)
+SMILE_DETECTOR = os.environ.get('SMILE_DETECTOR', 'cascade')
+SMILE_EDGE_THRESHOLD = float(os.environ.get('SMILE_EDGE_THRESHOLD', 0.12))
+
+# Faces smaller than this can't yield eyes at the 20px minimum eye size; their
+# eyes are treated as unknown rather than closed
+MIN_EYE_FACE_SIZE = 80
+
+# Per-thread frame buffers, reused while the size holds. Only used on the
+# cascade_executor workers, which outlive requests (a dev-server request
+# thread serves a single request, so its buffers would never be reused).
+_frame_buffers = threading.local()
+
+
+def _get_buffer(name, shape):
+    """Return this thread's uint8 buffer of the given shape, reallocating on change."""
+    buf = getattr(_frame_buffers, name, None)
+    if buf is None or buf.shape != shape:
+        buf = np.empty(shape, dtype=np.uint8)
+        setattr(_frame_buffers, name, buf)
+    return buf
+
+
+# All cascades run on this pool: face detection once per frame, eye/smile per
+# face (detectMultiScale releases the GIL). A CascadeClassifier isn't safe to
+# share across threads, so each worker loads its own copy, once; request
+# threads are short-lived under the threaded dev server and never load any.
+cascade_executor = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1, thread_name_prefix='cascade'
+)
+_worker_cascades = threading.local()
+
+
+def _get_cascade(name, path):
+    """Return this thread's copy of a cascade, loading it on first use."""
+    cascade = getattr(_worker_cascades, name, None)
+    if cascade is None:
+        cascade = cv2.CascadeClassifier(path)
+        setattr(_worker_cascades, name, cascade)
+    return cascade
+
+
+def _get_yunet(input_size):
+    """
+    Return this thread's YuNet detector, sized for the given (w, h) input.
+    
+    Only called on cascade_executor workers, so the ONNX model is loaded once
+    per worker rather than once per request thread.
+    """
+    detector = getattr(_worker_cascades, 'yunet', None)
+    if detector is None:
+        detector = cv2.FaceDetectorYN.create(
+            YUNET_MODEL, '', input_size, YUNET_SCORE_THRESHOLD
+        )
+        _worker_cascades.yunet = detector
+    else:
+        detector.setInputSize(input_size)
+    return detector
 
-print("✅ OpenCV Face/Eye/Smile detectors loaded")
 
 # Student tracking data
 class StudentTracker:
@@ -33,84 +164,211 @@ class StudentTracker:
         self.engagement_history = deque(maxlen=30)
         self.drowsiness_history = deque(maxlen=30)
         
+        # Running sums of the numeric windows, so averages are O(1)
+        self._attention_sum = 0.0
+        self._engagement_sum = 0.0
+        self._drowsiness_sum = 0.0
+        
     def add_reading(self, attention, emotion, engagement, drowsiness):
+        # All windows share a length; subtract the readings about to be evicted
+        if len(self.attention_history) == self.attention_history.maxlen:
+            self._attention_sum -= self.attention_history[0]
+            self._engagement_sum -= self.engagement_history[0]
+            self._drowsiness_sum -= self.drowsiness_history[0]
+        
         self.attention_history.append(attention)
         self.emotion_history.append(emotion)
         self.engagement_history.append(engagement)
         self.drowsiness_history.append(drowsiness)
+        
+        self._attention_sum += attention
+        self._engagement_sum += engagement
+        self._drowsiness_sum += drowsiness
     
     def get_averages(self):
+        count = len(self.attention_history)
+        if count == 0:
+            return {'attention': 0, 'engagement': 0, 'drowsiness': 0}
+        
         return {
-            'attention': np.mean(self.attention_history) if self.attention_history else 0,
-            'engagement': np.mean(self.engagement_history) if self.engagement_history else 0,
-            'drowsiness': np.mean(self.drowsiness_history) if self.drowsiness_history else 0
+            'attention': self._attention_sum / count,
+            'engagement': self._engagement_sum / count,
+            'drowsiness': self._drowsiness_sum / count
         }
 
 tracker = StudentTracker()
 
 
-def analyze_face(face_roi_gray, face_roi_color):
+def detect_eyes(face_roi_gray):
     """
-    Analyze a single face for attention, drowsiness, and emotion.
+    Detect eyes in a face ROI.
+    
+    Returns None for faces too small to hold a 20px eye (eyes unknown); eyes
+    are never more than half the face, which lets the cascade stop early.
     """
     h, w = face_roi_gray.shape
+    if h < MIN_EYE_FACE_SIZE:
+        return None
     
-    # Detect eyes
-    eyes = eye_cascade.detectMultiScale(face_roi_gray, 1.1, 5, minSize=(20, 20))
-    
-    # Detect smile
-    smiles = smile_cascade.detectMultiScale(face_roi_gray, 1.8, 20, minSize=(25, 25))
+    return _get_cascade('eye', EYE_CASCADE_PATH).detectMultiScale(
+        face_roi_gray, 1.1, 5, minSize=(20, 20), maxSize=(w // 2, h // 2)
+    )
+
+
+def detect_smiles(face_roi_gray):
+    """
+    Detect smiles in a face ROI.
+    """
+    return _get_cascade('smile', SMILE_CASCADE_PATH).detectMultiScale(
+        face_roi_gray, 1.8, 20, minSize=(25, 25)
+    )
+
+
+def is_smiling(face_roi_gray):
+    """
+    Decide whether a face ROI is smiling.
     
-    # Calculate attention based on face position and eyes
-    attention = 70  # Base attention
+    With SMILE_DETECTOR=edges, uses Canny edge density in the mouth region
+    (bottom third, middle half) instead of the smile cascade.
+    """
+    if SMILE_DETECTOR != 'edges':
+        return len(detect_smiles(face_roi_gray)) > 0
     
-    # If eyes detected, student is likely paying attention
-    if len(eyes) >= 2:
-        attention = 85
-    elif len(eyes) == 1:
-        attention = 60  # Might be looking sideways
-    else:
-        attention = 40  # Eyes not detected - looking away or closed
+    h, w = face_roi_gray.shape
+    mouth = face_roi_gray[2 * h // 3:, w // 4:3 * w // 4]
+    if mouth.size == 0:
+        return False
     
-    # Calculate drowsiness based on eye detection
+    edges = cv2.Canny(mouth, 80, 160)
+    return cv2.countNonZero(edges) / edges.size > SMILE_EDGE_THRESHOLD
+
+
+def count_closed_eyes(eyes):
+    """
+    Count eyes whose height/width ratio suggests they are mostly closed.
+    """
     if len(eyes) == 0:
-        drowsiness = 70  # Eyes closed or looking away
-    elif len(eyes) == 1:
-        drowsiness = 40
-    else:
-        # Check eye openness by analyzing the eye regions
-        drowsiness = 20
-        for (ex, ey, ew, eh) in eyes:
-            eye_aspect_ratio = eh / ew if ew > 0 else 0
-            if eye_aspect_ratio < 0.3:  # Eyes more closed
-                drowsiness += 20
-    
-    drowsiness = min(100, max(0, drowsiness))
-    
-    # Detect emotion based on smile
-    if len(smiles) > 0:
-        emotion = 'happy'
-        engagement = 80
+        return 0
+    
+    eyes = np.asarray(eyes, dtype=np.float64)
+    ew, eh = eyes[:, 2], eyes[:, 3]
+    eye_aspect_ratio = np.divide(eh, ew, out=np.zeros(len(eyes)), where=ew > 0)
+    return int(np.count_nonzero(eye_aspect_ratio < 0.3))
+
+
+def score_faces(eye_counts, closed_eyes, smiling):
+    """
+    Score attention, drowsiness, and engagement for all faces at once.
+    
+    Takes per-face eye counts (-1 when the face is too small to check its
+    eyes), closed-eye counts and smile flags; returns three float arrays.
+    """
+    eye_counts = np.asarray(eye_counts)
+    
+    # Two eyes: likely paying attention; one: might be looking sideways;
+    # none: looking away or closed. Unknown eyes score like the uncertain
+    # one-eye case, so small faces raise no attention or drowsiness alerts.
+    uncertain = (eye_counts == 1) | (eye_counts < 0)
+    attention = np.select([eye_counts >= 2, uncertain], [85.0, 60.0], 40.0)
+    
+    # Drowsiness from eye detection, plus eye openness when both eyes are found
+    drowsiness = np.select(
+        [eye_counts == 0, uncertain],
+        [70.0, 40.0],
+        20.0 + 20.0 * np.asarray(closed_eyes)
+    )
+    np.clip(drowsiness, 0, 100, out=drowsiness)
+    
+    # Engagement from smile, adjusted by attention
+    engagement = (np.where(smiling, 80.0, 50.0) + attention) / 2
+    
+    return attention, drowsiness, engagement
+
+
+def detect_faces_cascade(small_bgr, min_size, max_size):
+    """
+    Detect faces with the face cascade on the downscaled color frame.
+    
+    Called from detect_faces on a cascade_executor worker, whose cascade copy
+    persists.
+    """
+    small = _get_buffer('small', small_bgr.shape[:2])
+    cv2.cvtColor(small_bgr, cv2.COLOR_BGR2GRAY, dst=small)
+    return _get_cascade('face', FACE_CASCADE_PATH).detectMultiScale(
+        cv2.UMat(small) if USE_OPENCL else small,
+        scaleFactor=FACE_SCALE_FACTOR,
+        minNeighbors=5,
+        minSize=(min_size, min_size),
+        maxSize=max_size
+    )
+
+
+def detect_faces_yunet(image, size, min_size, max_size):
+    """
+    Detect faces with YuNet on the color frame resized to size (w, h).
+    
+    Returns (x, y, w, h) boxes in the resized frame's coordinates, filtered
+    to the same size range as the cascade. Called from detect_faces on a
+    cascade_executor worker, whose detector persists.
+    """
+    if size != (image.shape[1], image.shape[0]):
+        image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+    
+    _, detections = _get_yunet(size).detect(image)
+    if detections is None:
+        return ()
+    
+    # Clip boxes to the frame, then apply the size bounds
+    x1 = np.clip(detections[:, 0], 0, size[0])
+    y1 = np.clip(detections[:, 1], 0, size[1])
+    x2 = np.clip(detections[:, 0] + detections[:, 2], 0, size[0])
+    y2 = np.clip(detections[:, 1] + detections[:, 3], 0, size[1])
+    boxes = np.stack([x1, y1, x2 - x1, y2 - y1], axis=1).astype(int)
+    
+    keep = ((boxes[:, 2] >= min_size) & (boxes[:, 3] >= min_size) &
+            (boxes[:, 2] <= max_size[0]) & (boxes[:, 3] <= max_size[1]))
+    return boxes[keep]
+
+
+def detect_faces(image, decode_scale=1):
+    """
+    Downscale a frame and detect faces on it, returning (faces, scale) with
+    boxes in the downscaled frame's coordinates.
+    
+    Runs on a cascade_executor worker, so its frame buffers and detectors are
+    reused across requests.
+    """
+    # Downscale the color frame first (cascade cost grows with pixel count),
+    # so the grayscale pass only touches the small frame
+    img_h, img_w = image.shape[:2]
+    scale = min(1.0, DETECTION_WIDTH / img_w)
+    small_bgr = image
+    if scale < 1.0:
+        small_size = (round(img_w * scale), round(img_h * scale))
+        small_bgr = _get_buffer('small_bgr', (small_size[1], small_size[0], 3))
+        cv2.resize(image, small_size, dst=small_bgr, interpolation=cv2.INTER_AREA)
+    
+    min_size = max(1, int(MIN_FACE_SIZE * scale / decode_scale))
+    max_size = (
+        max(min_size, int(small_bgr.shape[1] * MAX_FACE_FRACTION)),
+        max(min_size, int(small_bgr.shape[0] * MAX_FACE_FRACTION))
+    )
+    
+    if YUNET_AVAILABLE:
+        faces = detect_faces_yunet(
+            small_bgr, (small_bgr.shape[1], small_bgr.shape[0]), min_size, max_size
+        )
     else:
-        emotion = 'neutral'
-        engagement = 50
-    
-    # Adjust engagement based on attention
-    engagement = (engagement + attention) / 2
-    
-    return {
-        'attention': round(attention, 1),
-        'drowsiness': round(drowsiness, 1),
-        'emotion': emotion,
-        'engagement': round(engagement, 1),
-        'eyes_detected': len(eyes),
-        'smiling': len(smiles) > 0
-    }
+        faces = detect_faces_cascade(small_bgr, min_size, max_size)
+    return faces, scale
 
 
-def analyze_classroom(image):
+def analyze_classroom(image, decode_scale=1):
     """
     Main analysis function - detects faces and analyzes engagement.
+    
+    decode_scale is the factor the frame was reduced by at decode time;
+    reported bboxes are scaled back up to the original frame.
     """
     results = {
         'students_detected': 0,
@@ -122,96 +380,145 @@ def analyze_classroom(image):
         'alerts': []
     }
     
-    # Convert to grayscale
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    # Detection runs on a persistent pool worker (see detect_faces)
+    faces, scale = cascade_executor.submit(detect_faces, image, decode_scale).result()
     
-    # Detect faces
-    faces = face_cascade.detectMultiScale(
-        gray,
-        scaleFactor=1.1,
-        minNeighbors=5,
-        minSize=(60, 60)
-    )
+    # Map boxes back to full resolution; eye/smile ROIs are cut from the full frame
+    if len(faces) > 0 and scale < 1.0:
+        faces = np.round(np.asarray(faces) / scale).astype(int)
     
     results['students_detected'] = len(faces)
     
     if len(faces) == 0:
         return results
     
-    total_attention = 0
-    total_engagement = 0
-    total_drowsiness = 0
-    emotions = []
+    num_faces = len(faces)
+    eye_counts = np.empty(num_faces, dtype=int)
+    closed_eyes = np.empty(num_faces, dtype=int)
+    smiling = np.empty(num_faces, dtype=bool)
+    
+    # Run the eye and smile cascades of every face concurrently, on full-resolution
+    # grayscale crops (only face pixels are converted)
+    rois = [cv2.cvtColor(image[y:y+h, x:x+w], cv2.COLOR_BGR2GRAY) for (x, y, w, h) in faces]
+    eye_futures = [cascade_executor.submit(detect_eyes, roi) for roi in rois]
+    smile_futures = [cascade_executor.submit(is_smiling, roi) for roi in rois]
+    
+    for idx, (eye_future, smile_future) in enumerate(zip(eye_futures, smile_futures)):
+        eyes = eye_future.result()
+        if eyes is None:
+            eye_counts[idx] = -1
+            closed_eyes[idx] = 0
+        else:
+            eye_counts[idx] = len(eyes)
+            closed_eyes[idx] = count_closed_eyes(eyes)
+        smiling[idx] = smile_future.result()
+    
+    # Score every face in one vectorized pass
+    attentions, drowsiness, engagements = score_faces(eye_counts, closed_eyes, smiling)
+    emotions = ['happy' if smile else 'neutral' for smile in smiling]
     
     for idx, (x, y, w, h) in enumerate(faces):
-        # Extract face region
-        face_roi_gray = gray[y:y+h, x:x+w]
-        face_roi_color = image[y:y+h, x:x+w]
-        
-        # Analyze this face
-        analysis = analyze_face(face_roi_gray, face_roi_color)
-        
-        total_attention += analysis['attention']
-        total_engagement += analysis['engagement']
-        total_drowsiness += analysis['drowsiness']
-        emotions.append(analysis['emotion'])
-        
         # Store face data
         results['faces'].append({
             'id': idx + 1,
-            'attention': analysis['attention'],
-            'drowsiness': analysis['drowsiness'],
-            'emotion': analysis['emotion'],
-            'engagement': analysis['engagement'],
-            'bbox': {'x': int(x), 'y': int(y), 'w': int(w), 'h': int(h)}
+            'attention': float(attentions[idx]),
+            'drowsiness': float(drowsiness[idx]),
+            'emotion': emotions[idx],
+            'engagement': float(engagements[idx]),
+            'bbox': {
+                'x': int(x * decode_scale), 'y': int(y * decode_scale),
+                'w': int(w * decode_scale), 'h': int(h * decode_scale)
+            }
         })
-        
-        # Generate alerts
-        if analysis['attention'] < 40:
-            results['alerts'].append(f"Student {idx+1}: Low attention ({analysis['attention']:.0f}%)")
-        if analysis['drowsiness'] > 60:
-            results['alerts'].append(f"Student {idx+1}: Appears drowsy ({analysis['drowsiness']:.0f}%)")
+    
+    # Generate alerts (per student, in face order)
+    low_attention = attentions < 40
+    drowsy = drowsiness > 60
+    for idx in np.flatnonzero(low_attention | drowsy):
+        if low_attention[idx]:
+            results['alerts'].append(f"Student {idx+1}: Low attention ({attentions[idx]:.0f}%)")
+        if drowsy[idx]:
+            results['alerts'].append(f"Student {idx+1}: Appears drowsy ({drowsiness[idx]:.0f}%)")
     
     # Calculate class averages
-    num_faces = len(faces)
-    results['class_attention'] = round(total_attention / num_faces, 1)
-    results['class_engagement'] = round(total_engagement / num_faces, 1)
-    results['class_drowsiness'] = round(total_drowsiness / num_faces, 1)
+    results['class_attention'] = round(float(attentions.mean()), 1)
+    results['class_engagement'] = round(float(engagements.mean()), 1)
+    results['class_drowsiness'] = round(float(drowsiness.mean()), 1)
     
     # Determine dominant emotion
     if emotions:
-        results['dominant_emotion'] = max(set(emotions), key=emotions.count)
+        results['dominant_emotion'] = Counter(emotions).most_common(1)[0][0]
+    
+    record_reading(results)
     
-    # Update tracker
+    return results
+
+
+def record_reading(results):
+    """Add a frame's class-level metrics to the rolling tracker."""
     tracker.add_reading(
         results['class_attention'],
         results['dominant_emotion'],
         results['class_engagement'],
         results['class_drowsiness']
     )
-    
-    return results
+
+
+def average_hash(image):
+    """16x16 average hash of a frame, as a 256-bit int."""
+    thumb = cv2.cvtColor(
+        cv2.resize(image, (16, 16), interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY
+    )
+    return int.from_bytes(np.packbits(thumb > thumb.mean()).tobytes(), 'big')
+
+
+def parse_json_body():
+    """Parse the request JSON body, with orjson when available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(request.get_data())
+    return request.json
+
+
+def json_response(payload, status=200):
+    """Serialize a JSON response, with orjson when available."""
+    if ORJSON_AVAILABLE:
+        body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+        return Response(body, status=status, mimetype='application/json')
+    return jsonify(payload), status
 
 
 @app.route('/analyze', methods=['POST'])
 def analyze():
     """API endpoint for frame analysis."""
+    global _last_frame
+    
     try:
-        data = request.json
+        data = parse_json_body()
         
         # Decode image
         image_data = data.get('image', '')
         if ',' in image_data:
-            image_data = image_data.split(',')[1]
+            image_data = image_data.split(',', 1)[1]
         
         nparr = np.frombuffer(base64.b64decode(image_data), np.uint8)
-        image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+        image = cv2.imdecode(nparr, DECODE_FLAGS)
         
         if image is None:
             return jsonify({'error': 'Invalid image'}), 400
         
-        # Analyze
-        results = analyze_classroom(image)
+        # Analyze, unless the frame is a near-duplicate of the last one
+        frame_hash = average_hash(image)
+        now = time.monotonic()
+        last_frame = _last_frame
+        if (last_frame is not None and
+                now - last_frame[2] < FRAME_CACHE_MAX_AGE and
+                bin(frame_hash ^ last_frame[0]).count('1') < FRAME_HASH_MAX_DISTANCE):
+            results = dict(last_frame[1])
+            if results['students_detected'] > 0:
+                record_reading(results)
+        else:
+            results = analyze_classroom(image, DECODE_SCALE)
+            _last_frame = (frame_hash, dict(results), now)
         
         # Add historical averages
         averages = tracker.get_averages()
@@ -219,7 +526,7 @@ def analyze():
         results['avg_engagement'] = round(averages['engagement'], 1)
         results['avg_drowsiness'] = round(averages['drowsiness'], 1)
         
-        return jsonify(results)
+        return json_response(results)
         
     except Exception as e:
         print(f"Analysis error: {e}")
@@ -243,8 +550,11 @@ def health():
     return jsonify({
         'status': 'running',
         'face_detection': True,
+        'face_cascade': FACE_CASCADE_TYPE,
+        'opencl': USE_OPENCL,
         'eye_detection': True,
-        'smile_detection': True
+        'smile_detection': True,
+        'smile_detector': SMILE_DETECTOR
     })
 
 
@@ -260,4 +570,7 @@ if __name__ == '__main__':
     print("\n🚀 Server starting at http://localhost:5000")
     print("📹 Open browser and allow camera access\n")
     
-    app.run(host='0.0.0.0', port=5000, debug=True, threaded=True)
+    # The debug reloader re-imports the module (parsing every cascade twice);
+    # opt in with FLASK_DEBUG=1
+    debug = os.environ.get('FLASK_DEBUG', '0') == '1'
+    app.run(host='0.0.0.0', port=5000, debug=debug, threaded=True)
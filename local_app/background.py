@@ -0,0 +1,69 @@
+"""
+Background Loader - Runs data_manager queries off the GUI thread
+"""
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtWidgets import QMessageBox
+
+
+class _LoadTask(QRunnable):
+    """Pool task that runs one load and reports back to its loader."""
+    
+    def __init__(self, loader, request: int, fn, args):
+        super().__init__()
+        self.loader = loader
+        self.request = request
+        self.fn = fn
+        self.args = args
+    
+    def run(self):
+        try:
+            result = self.fn(*self.args)
+        except Exception as e:
+            print(f"Background load error: {e}")
+            self._emit('failed', str(e))
+        else:
+            self._emit('finished', result)
+    
+    def _emit(self, signal: str, value):
+        try:
+            getattr(self.loader, signal).emit(self.request, value)
+        except RuntimeError:
+            # Owner widget was closed while the query ran
+            pass
+
+
+class BackgroundLoader(QObject):
+    """
+    Runs a function on the global QThreadPool and passes its result to a
+    callback on the GUI thread. Only the latest request is delivered, so
+    rapid refreshes (e.g. typing in a search box) never show stale data.
+    If the function raises, on_error gets the message instead (by default
+    a warning box over the parent widget).
+    """
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+    
+    def __init__(self, callback, parent=None, on_error=None):
+        super().__init__(parent)
+        self.callback = callback
+        self.on_error = on_error or self._show_error
+        self.request = 0
+        self.finished.connect(self._deliver)
+        self.failed.connect(self._deliver_error)
+    
+    def load(self, fn, *args):
+        """Run fn(*args) in the background."""
+        self.request += 1
+        QThreadPool.globalInstance().start(_LoadTask(self, self.request, fn, args))
+    
+    def _deliver(self, request: int, result):
+        if request == self.request:
+            self.callback(result)
+    
+    def _deliver_error(self, request: int, message: str):
+        if request == self.request:
+            self.on_error(message)
+    
+    def _show_error(self, message: str):
+        QMessageBox.warning(self.parent(), "Error", f"Could not load data: {message}")
@@ -1,17 +1,30 @@
 """
-Data Manager - CSV-based local storage for AI Classroom Monitor
+Data Manager - SQLite-based local storage for AI Classroom Monitor
 Handles all data operations for students, sessions, events, and analytics
 """
 
 import os
 import csv
 import json
-import uuid
+import atexit
+import operator
+import sqlite3
+import threading
+import time
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional, Any
-from dataclasses import dataclass, asdict, field
+from typing import List, Dict, Optional
+from dataclasses import dataclass, fields
+
+# Try to import pyarrow (multithreaded C++ CSV reader for the legacy import)
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
 
 
 # Data directory setup
@@ -23,13 +36,68 @@ EMBEDDINGS_DIR = BASE_DIR / "embeddings"
 DATA_DIR.mkdir(exist_ok=True)
 EMBEDDINGS_DIR.mkdir(exist_ok=True)
 
-# CSV file paths
+# Database file
+DB_FILE = DATA_DIR / "classroom.db"
+
+# All per-student embeddings stacked into one (N, D) matrix, plus the
+# embedding filename -> matrix row index
+ALL_EMBEDDINGS_FILE = EMBEDDINGS_DIR / "all_embeddings.npy"
+ALL_EMBEDDING_IDS_FILE = EMBEDDINGS_DIR / "all_ids.json"
+
+# Embeddings are L2-normalized and stored at half precision (plenty for
+# cosine similarity); they are widened back to float32 once, on load
+EMBEDDING_STORAGE_DTYPE = np.float16
+
+# Threads used to read the per-student files when rebuilding the matrix
+EMBEDDING_LOAD_WORKERS = 8
+
+# Legacy CSV file paths (imported into the database once, if present)
 STUDENTS_FILE = DATA_DIR / "students.csv"
 SESSIONS_FILE = DATA_DIR / "sessions.csv"
 EVENTS_FILE = DATA_DIR / "events.csv"
 ATTENTION_LOGS_FILE = DATA_DIR / "attention_logs.csv"
 SETTINGS_FILE = DATA_DIR / "settings.json"
 
+# Record IDs are drawn from a pool of random bytes refilled UUID_POOL_SIZE
+# IDs at a time, instead of one os.urandom() call per uuid4()
+UUID_POOL_SIZE = 1024
+_uuid_pool = b''
+_uuid_pool_pos = 0
+_uuid_lock = threading.Lock()
+
+
+def fast_uuid() -> str:
+    """Return a random (version 4) UUID string, like str(uuid.uuid4())."""
+    global _uuid_pool, _uuid_pool_pos
+    with _uuid_lock:
+        if _uuid_pool_pos >= len(_uuid_pool):
+            _uuid_pool = os.urandom(16 * UUID_POOL_SIZE)
+            _uuid_pool_pos = 0
+        raw = bytearray(_uuid_pool[_uuid_pool_pos:_uuid_pool_pos + 16])
+        _uuid_pool_pos += 16
+    # Version 4 and RFC 4122 variant bits, formatted without building a UUID object
+    raw[6] = (raw[6] & 0x0F) | 0x40
+    raw[8] = (raw[8] & 0x3F) | 0x80
+    h = raw.hex()
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+# Default record timestamps are formatted at most once per TIMESTAMP_RESOLUTION_NS;
+# every log and event of one frame gets the same stamp
+TIMESTAMP_RESOLUTION_NS = 10_000_000
+_timestamp_cache = (-1, '')
+
+
+def _now_iso() -> str:
+    """datetime.now().isoformat(), cached at TIMESTAMP_RESOLUTION_NS granularity."""
+    global _timestamp_cache
+    bucket = time.monotonic_ns() // TIMESTAMP_RESOLUTION_NS
+    cached_bucket, stamp = _timestamp_cache
+    if bucket != cached_bucket:
+        stamp = datetime.now().isoformat()
+        _timestamp_cache = (bucket, stamp)
+    return stamp
+
 
 @dataclass
 class Student:
@@ -46,11 +114,11 @@ class Student:
     
     def __post_init__(self):
         if not self.id:
-            self.id = str(uuid.uuid4())
+            self.id = fast_uuid()
         if not self.created_at:
-            self.created_at = datetime.now().isoformat()
+            self.created_at = _now_iso()
         if not self.updated_at:
-            self.updated_at = datetime.now().isoformat()
+            self.updated_at = _now_iso()
 
 
 @dataclass
@@ -71,9 +139,9 @@ class Session:
     
     def __post_init__(self):
         if not self.id:
-            self.id = str(uuid.uuid4())
+            self.id = fast_uuid()
         if not self.created_at:
-            self.created_at = datetime.now().isoformat()
+            self.created_at = _now_iso()
 
 
 @dataclass
@@ -89,9 +157,9 @@ class Event:
     
     def __post_init__(self):
         if not self.id:
-            self.id = str(uuid.uuid4())
+            self.id = fast_uuid()
         if not self.timestamp:
-            self.timestamp = datetime.now().isoformat()
+            self.timestamp = _now_iso()
 
 
 @dataclass
@@ -110,382 +178,702 @@ class AttentionLog:
     
     def __post_init__(self):
         if not self.id:
-            self.id = str(uuid.uuid4())
+            self.id = fast_uuid()
         if not self.timestamp:
-            self.timestamp = datetime.now().isoformat()
+            self.timestamp = _now_iso()
+
+
+@dataclass
+class SessionBundle:
+    """A session with its analytics and events, read together."""
+    session: Optional[Session]
+    analytics: Dict
+    events: List[Event]
+
+
+# Table schemas; column order matches the dataclass field order
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS students (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    student_id TEXT NOT NULL,
+    email TEXT DEFAULT '',
+    course TEXT DEFAULT '',
+    department TEXT DEFAULT '',
+    enrollment_status TEXT DEFAULT 'not_enrolled',
+    embedding_file TEXT DEFAULT '',
+    created_at TEXT DEFAULT '',
+    updated_at TEXT DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_students_enrollment ON students (enrollment_status);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    course_name TEXT NOT NULL,
+    room_number TEXT DEFAULT '',
+    description TEXT DEFAULT '',
+    status TEXT DEFAULT 'created',
+    duration_seconds INTEGER DEFAULT 0,
+    peak_students INTEGER DEFAULT 0,
+    avg_attention REAL DEFAULT 0,
+    total_events INTEGER DEFAULT 0,
+    created_at TEXT DEFAULT '',
+    started_at TEXT DEFAULT '',
+    completed_at TEXT DEFAULT ''
+);
+-- (status, created_at) serves status-filtered lists already in order, no sort step
+DROP INDEX IF EXISTS idx_sessions_status;
+CREATE INDEX IF NOT EXISTS idx_sessions_status_created ON sessions (status, created_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_created ON sessions (created_at);
+
+CREATE TABLE IF NOT EXISTS events (
+    id TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    student_id TEXT DEFAULT '',
+    student_name TEXT DEFAULT '',
+    track_id INTEGER DEFAULT 0,
+    event_type TEXT DEFAULT '',
+    details TEXT DEFAULT '',
+    timestamp TEXT DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_events_session ON events (session_id, timestamp);
+
+CREATE TABLE IF NOT EXISTS attention_logs (
+    id TEXT PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    student_id TEXT DEFAULT '',
+    student_name TEXT DEFAULT '',
+    track_id INTEGER DEFAULT 0,
+    attention_score REAL DEFAULT 0,
+    emotion TEXT DEFAULT '',
+    gaze_direction TEXT DEFAULT '',
+    posture TEXT DEFAULT '',
+    phone_detected INTEGER DEFAULT 0,
+    timestamp TEXT DEFAULT ''
+);
+-- Covering index: per-session analytics read only these columns, straight from
+-- the index, never touching the wide log rows
+CREATE INDEX IF NOT EXISTS idx_attention_logs_session ON attention_logs (
+    session_id, student_id, track_id, attention_score, student_name
+);
+"""
+
+STUDENT_COLUMNS = [f.name for f in fields(Student)]
+SESSION_COLUMNS = [f.name for f in fields(Session)]
+EVENT_COLUMNS = [f.name for f in fields(Event)]
+ATTENTION_LOG_COLUMNS = [f.name for f in fields(AttentionLog)]
+
+# Record -> insert-parameter tuple, in column order, in a single C call
+STUDENT_ROW = operator.attrgetter(*STUDENT_COLUMNS)
+SESSION_ROW = operator.attrgetter(*SESSION_COLUMNS)
+EVENT_ROW = operator.attrgetter(*EVENT_COLUMNS)
+ATTENTION_LOG_ROW = operator.attrgetter(*ATTENTION_LOG_COLUMNS)
+
+# Event/attention-log inserts are buffered and written in one transaction once
+# this many are pending, or every WRITE_FLUSH_INTERVAL seconds
+WRITE_BUFFER_SIZE = 256
+WRITE_FLUSH_INTERVAL = 1.0
+
+# Rows fetched per batch when streaming query results
+FETCH_BATCH_SIZE = 256
+
+# Per-session query results kept until the database changes
+SESSION_CACHE_SIZE = 16
+
+# Per-student grouping key: student ID, or the track for unidentified students
+STUDENT_KEY_SQL = "CASE WHEN student_id != '' THEN student_id ELSE 'track_' || track_id END"
+
+
+def _from_row(cls, columns: List[str], row):
+    """Build a stored row into a record without re-running __init__/__post_init__.
+    
+    Rows read back from the database already carry their id and timestamps,
+    so the defaulting in __post_init__ (a uuid4 and a datetime.now() per row)
+    is pure overhead on large reads.
+    """
+    obj = object.__new__(cls)
+    obj.__dict__.update(zip(columns, row))
+    return obj
+
+
+def _insert_sql(table: str, columns: List[str]) -> str:
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})"
+
+
+def _atomic_save(path: Path, array: np.ndarray):
+    """np.save through a private temp file and os.replace, so readers never see a torn file."""
+    tmp = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp.npy")
+    np.save(tmp, array)
+    os.replace(tmp, path)
+
+
+# Numeric columns in the legacy CSV files; empty fields are read as 0
+LEGACY_NUMERIC_COLUMNS = {
+    'duration_seconds': int,
+    'peak_students': int,
+    'avg_attention': float,
+    'total_events': int,
+    'track_id': int,
+    'attention_score': float,
+}
+
+
+def _unicode_lower(value):
+    """SQL lower() that folds case for all of Unicode, not just ASCII."""
+    return value.lower() if isinstance(value, str) else value
+
+
+def _read_legacy_csv(path: Path, columns: List[str]):
+    """Stream rows of a legacy CSV file, projected onto the given columns."""
+    converters = [
+        (i, LEGACY_NUMERIC_COLUMNS[c]) for i, c in enumerate(columns)
+        if c in LEGACY_NUMERIC_COLUMNS
+    ]
+    if PYARROW_AVAILABLE:
+        rows = _read_legacy_csv_arrow(path, columns)
+    else:
+        rows = _read_legacy_csv_text(path, columns)
+    for values in rows:
+        for i, convert in converters:
+            values[i] = convert(values[i] or 0)
+        yield values
+
+
+def _read_legacy_csv_text(path: Path, columns: List[str]):
+    """Parse a legacy CSV file with the csv module, yielding rows of the given columns."""
+    # Large buffer: legacy files can hold a whole term of attention logs
+    with open(path, 'r', newline='', encoding='utf-8', buffering=1 << 20) as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        positions = [header.index(c) if c in header else None for c in columns]
+        phone_idx = columns.index('phone_detected') if 'phone_detected' in columns else None
+        
+        for row in reader:
+            values = [
+                row[i] if i is not None and i < len(row) else '' for i in positions
+            ]
+            if phone_idx is not None:
+                values[phone_idx] = values[phone_idx] == 'True'
+            yield values
+
+
+def _read_legacy_csv_arrow(path: Path, columns: List[str]):
+    """Parse a legacy CSV file with pyarrow, yielding rows of the given columns."""
+    with open(path, 'r', encoding='utf-8') as f:
+        header = next(csv.reader(f), [])
+    present = [c for c in columns if c in header]
+    if not present:
+        return
+    
+    # Read everything as strings, like csv.reader, so IDs such as '007' survive
+    table = pacsv.read_csv(
+        path,
+        convert_options=pacsv.ConvertOptions(
+            include_columns=present,
+            column_types={c: pa.string() for c in present}
+        )
+    )
+    column_values = [
+        table.column(c).to_pylist() if c in present else [''] * table.num_rows
+        for c in columns
+    ]
+    if 'phone_detected' in columns:
+        phone_idx = columns.index('phone_detected')
+        column_values[phone_idx] = [v == 'True' for v in column_values[phone_idx]]
+    
+    for values in zip(*column_values):
+        yield [('' if v is None else v) for v in values]
 
 
 class DataManager:
     """
-    Manages all CSV-based data operations for the local application.
-    Thread-safe and provides simple CRUD operations.
+    Manages all SQLite-based data operations for the local application.
+    Thread-safe (one shared connection behind a lock) and provides simple CRUD operations.
     """
     
-    def __init__(self):
-        self._init_csv_files()
-    
-    def _init_csv_files(self):
-        """Initialize CSV files with headers if they don't exist."""
-        # Students CSV
-        if not STUDENTS_FILE.exists():
-            with open(STUDENTS_FILE, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    'id', 'name', 'student_id', 'email', 'course', 'department',
-                    'enrollment_status', 'embedding_file', 'created_at', 'updated_at'
-                ])
-        
-        # Sessions CSV
-        if not SESSIONS_FILE.exists():
-            with open(SESSIONS_FILE, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    'id', 'name', 'course_name', 'room_number', 'description',
-                    'status', 'duration_seconds', 'peak_students', 'avg_attention',
-                    'total_events', 'created_at', 'started_at', 'completed_at'
-                ])
-        
-        # Events CSV
-        if not EVENTS_FILE.exists():
-            with open(EVENTS_FILE, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    'id', 'session_id', 'student_id', 'student_name', 'track_id',
-                    'event_type', 'details', 'timestamp'
-                ])
-        
-        # Attention Logs CSV
-        if not ATTENTION_LOGS_FILE.exists():
-            with open(ATTENTION_LOGS_FILE, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    'id', 'session_id', 'student_id', 'student_name', 'track_id',
-                    'attention_score', 'emotion', 'gaze_direction', 'posture',
-                    'phone_detected', 'timestamp'
-                ])
+    def __init__(self, db_path: Path = DB_FILE):
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.create_function('unicode_lower', 1, _unicode_lower, deterministic=True)
+        self._init_db()
+        
+        # Pending high-rate inserts, keyed by table
+        self._pending = {'events': [], 'attention_logs': []}
+        
+        # Loaded recognition embeddings, cleared whenever students change
+        self._emb_cache = None
+        self._emb_data_version = None
+        
+        # Session analytics/events results, keyed by query, with the data
+        # token they were computed at (see _cached)
+        self._session_cache = {}
+        
+        self._flush_thread = threading.Thread(
+            target=self._flush_periodically, name='DataManagerFlush', daemon=True
+        )
+        self._flush_thread.start()
+        atexit.register(self.flush)
+    
+    def _init_db(self):
+        """Create tables and indexes, importing legacy CSV data on first run."""
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            is_new = self._conn.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE name = 'students'"
+            ).fetchone()[0] == 0
+            self._conn.executescript(SCHEMA)
+            
+            if is_new:
+                self._import_csv_files()
+    
+    def _import_csv_files(self):
+        """Import rows from the legacy CSV files, if they exist."""
+        legacy = [
+            ('students', STUDENT_COLUMNS, STUDENTS_FILE),
+            ('sessions', SESSION_COLUMNS, SESSIONS_FILE),
+            ('events', EVENT_COLUMNS, EVENTS_FILE),
+            ('attention_logs', ATTENTION_LOG_COLUMNS, ATTENTION_LOGS_FILE),
+        ]
+        with self._conn:
+            for table, columns, path in legacy:
+                if path.exists():
+                    # executemany consumes the generator, so rows stream from disk
+                    self._conn.executemany(
+                        _insert_sql(table, columns).replace('INSERT', 'INSERT OR IGNORE', 1),
+                        _read_legacy_csv(path, columns)
+                    )
+    
+    def _buffer_insert(self, table: str, row: tuple):
+        """Queue a row for a batched insert, flushing when the buffer is full."""
+        with self._lock:
+            pending = self._pending[table]
+            pending.append(row)
+            if len(pending) >= WRITE_BUFFER_SIZE:
+                self.flush()
+    
+    def flush(self):
+        """Write all buffered events and attention logs in one transaction."""
+        with self._lock:
+            if not any(self._pending.values()):
+                return
+            # Take the batch before writing, so a bad row can't keep it queued
+            pending = self._pending
+            self._pending = {'events': [], 'attention_logs': []}
+            try:
+                with self._conn:
+                    self._conn.executemany(
+                        _insert_sql('events', EVENT_COLUMNS), pending['events']
+                    )
+                    self._conn.executemany(
+                        _insert_sql('attention_logs', ATTENTION_LOG_COLUMNS),
+                        pending['attention_logs']
+                    )
+            except sqlite3.Error as e:
+                print(f"Error flushing buffered writes, retrying row by row: {e}")
+                self._insert_rows_individually(pending)
+    
+    def _insert_rows_individually(self, pending: Dict):
+        """Insert buffered rows one at a time, dropping (and logging) rows that fail."""
+        columns = {'events': EVENT_COLUMNS, 'attention_logs': ATTENTION_LOG_COLUMNS}
+        for table, rows in pending.items():
+            sql = _insert_sql(table, columns[table])
+            for row in rows:
+                try:
+                    with self._conn:
+                        self._conn.execute(sql, row)
+                except sqlite3.Error as e:
+                    print(f"Dropping buffered {table} row {row[0]}: {e}")
+    
+    def _flush_periodically(self):
+        while True:
+            time.sleep(WRITE_FLUSH_INTERVAL)
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"Error flushing buffered writes: {e}")
+    
+    def _query(self, sql: str, params=()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+    
+    def _data_token(self) -> tuple:
+        """Value that changes whenever this or another connection writes."""
+        return (
+            self._conn.execute("PRAGMA data_version").fetchone()[0],
+            self._conn.total_changes
+        )
+    
+    def _cached(self, key: tuple, compute):
+        """Return compute(), reusing the previous result for key until the data changes."""
+        self.flush()
+        with self._lock:
+            token = self._data_token()
+            hit = self._session_cache.get(key)
+            if hit is not None and hit[0] == token:
+                return hit[1]
+            
+            value = compute()
+            self._session_cache.pop(key, None)
+            self._session_cache[key] = (token, value)
+            if len(self._session_cache) > SESSION_CACHE_SIZE:
+                # Dicts keep insertion order, so the first key is the oldest
+                del self._session_cache[next(iter(self._session_cache))]
+            return value
+    
+    def _execute(self, sql: str, params=()) -> int:
+        """Run a write statement in its own transaction; returns the changed row count."""
+        with self._lock, self._conn:
+            return self._conn.execute(sql, params).rowcount
+    
+    def _update_row(self, table: str, columns: List[str], row_id: str, updates: Dict):
+        """
+        UPDATE known columns of one row by id and read it back, atomically.
+        
+        Returns the updated row tuple, or None if no row has that id.
+        """
+        updates = {k: v for k, v in updates.items() if k in columns and k != 'id'}
+        with self._lock, self._conn:
+            if updates:
+                assignments = ', '.join(f"{k} = ?" for k in updates)
+                changed = self._conn.execute(
+                    f"UPDATE {table} SET {assignments} WHERE id = ?",
+                    (*updates.values(), row_id)
+                ).rowcount
+                if not changed:
+                    return None
+            return self._conn.execute(
+                f"SELECT {', '.join(columns)} FROM {table} WHERE id = ?", (row_id,)
+            ).fetchone()
+    
+    def compact_if_needed(self) -> bool:
+        """
+        Rebuild the database file once more than half of its pages are free.
+        
+        Writes already append to the WAL and are checkpointed in place; only
+        bulk deletes leave free pages behind, so they call this afterwards.
+        """
+        with self._lock:
+            page_count = self._conn.execute("PRAGMA page_count").fetchone()[0]
+            free_pages = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+            if free_pages * 2 <= page_count:
+                return False
+            self._conn.execute("VACUUM")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return True
     
     # ===================== STUDENTS =====================
     
+    def _iter_students(self, where: str = "", params=()):
+        """Yield students in insertion order, fetching rows in batches.
+        
+        The lock is only held while a batch is fetched, so a slow consumer
+        does not block other threads.
+        """
+        sql = f"SELECT {', '.join(STUDENT_COLUMNS)} FROM students {where} ORDER BY rowid"
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(FETCH_BATCH_SIZE)
+            if not rows:
+                return
+            for row in rows:
+                yield _from_row(Student, STUDENT_COLUMNS, row)
+    
     def get_students(self, search: str = "") -> List[Student]:
         """Get all students, optionally filtered by search term."""
-        students = []
-        if not STUDENTS_FILE.exists():
-            return students
-        
-        with open(STUDENTS_FILE, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                student = Student(**row)
-                if search:
-                    if search.lower() in student.name.lower() or \
-                       search.lower() in student.student_id.lower():
-                        students.append(student)
-                else:
-                    students.append(student)
+        if not search:
+            return list(self._iter_students())
         
-        return students
+        # Case-insensitive substring match; LIKE only folds ASCII letters
+        search = search.lower()
+        return list(self._iter_students(
+            "WHERE instr(unicode_lower(name), ?) > 0 OR instr(unicode_lower(student_id), ?) > 0",
+            (search, search)
+        ))
     
     def get_student(self, student_id: str) -> Optional[Student]:
         """Get a single student by ID."""
-        students = self.get_students()
-        for s in students:
-            if s.id == student_id:
-                return s
-        return None
+        rows = self._query(
+            f"SELECT {', '.join(STUDENT_COLUMNS)} FROM students WHERE id = ?", (student_id,)
+        )
+        return _from_row(Student, STUDENT_COLUMNS, rows[0]) if rows else None
     
     def add_student(self, student: Student) -> Student:
         """Add a new student."""
-        with open(STUDENTS_FILE, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                student.id, student.name, student.student_id, student.email,
-                student.course, student.department, student.enrollment_status,
-                student.embedding_file, student.created_at, student.updated_at
-            ])
+        self._execute(
+            _insert_sql('students', STUDENT_COLUMNS),
+            STUDENT_ROW(student)
+        )
+        self._invalidate_embeddings()
         return student
     
     def update_student(self, student_id: str, updates: Dict) -> Optional[Student]:
         """Update a student's information."""
-        students = self.get_students()
-        updated_student = None
-        
-        for i, s in enumerate(students):
-            if s.id == student_id:
-                for key, value in updates.items():
-                    if hasattr(s, key):
-                        setattr(s, key, value)
-                s.updated_at = datetime.now().isoformat()
-                updated_student = s
-                break
-        
-        if updated_student:
-            self._save_students(students)
-        
-        return updated_student
+        updates = dict(updates, updated_at=datetime.now().isoformat())
+        row = self._update_row('students', STUDENT_COLUMNS, student_id, updates)
+        self._invalidate_embeddings()
+        return _from_row(Student, STUDENT_COLUMNS, row) if row else None
     
     def delete_student(self, student_id: str) -> bool:
         """Delete a student and their embedding file."""
-        students = self.get_students()
-        original_len = len(students)
-        
-        # Find and remove student
-        student_to_delete = None
-        for s in students:
-            if s.id == student_id:
-                student_to_delete = s
-                break
-        
-        if student_to_delete:
-            students.remove(student_to_delete)
-            
-            # Delete embedding file if exists
-            if student_to_delete.embedding_file:
-                embedding_path = EMBEDDINGS_DIR / student_to_delete.embedding_file
-                if embedding_path.exists():
-                    embedding_path.unlink()
-            
-            self._save_students(students)
-            return True
-        
-        return False
-    
-    def _save_students(self, students: List[Student]):
-        """Save all students to CSV (overwrites file)."""
-        with open(STUDENTS_FILE, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                'id', 'name', 'student_id', 'email', 'course', 'department',
-                'enrollment_status', 'embedding_file', 'created_at', 'updated_at'
-            ])
-            for s in students:
-                writer.writerow([
-                    s.id, s.name, s.student_id, s.email, s.course, s.department,
-                    s.enrollment_status, s.embedding_file, s.created_at, s.updated_at
-                ])
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT embedding_file FROM students WHERE id = ?", (student_id,)
+            ).fetchone()
+            if row is None:
+                return False
+            self._conn.execute("DELETE FROM students WHERE id = ?", (student_id,))
+        self._invalidate_embeddings()
+        
+        # Delete embedding file if exists
+        embedding_file = row[0]
+        if embedding_file:
+            embedding_path = EMBEDDINGS_DIR / embedding_file
+            if embedding_path.exists():
+                embedding_path.unlink()
+                self._rebuild_embedding_matrix()
+        
+        return True
     
     def get_enrolled_students(self) -> List[Student]:
         """Get students with completed enrollment."""
-        return [s for s in self.get_students() if s.enrollment_status == 'enrolled']
+        return list(self._iter_students("WHERE enrollment_status = 'enrolled'"))
+    
+    def _invalidate_embeddings(self):
+        with self._lock:
+            self._emb_cache = None
     
     def get_student_embeddings(self) -> List[Dict]:
-        """Get all enrolled students with their embeddings for recognition."""
-        embeddings = []
-        for student in self.get_enrolled_students():
-            if student.embedding_file:
-                embedding_path = EMBEDDINGS_DIR / student.embedding_file
-                if embedding_path.exists():
-                    embedding = np.load(embedding_path)
+        """Get all enrolled students with their embeddings for recognition.
+        
+        The loaded embeddings are cached until a student or embedding changes,
+        here or (via PRAGMA data_version) through another connection.
+        """
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if self._emb_cache is not None and data_version == self._emb_data_version:
+                return list(self._emb_cache)
+            
+            if not ALL_EMBEDDING_IDS_FILE.exists():
+                self._rebuild_embedding_matrix()
+            matrix, rows = self._load_embedding_matrix()
+            
+            embeddings = []
+            for student in self._iter_students("WHERE enrollment_status = 'enrolled'"):
+                if student.embedding_file:
+                    row = rows.get(student.embedding_file)
+                    if row is not None:
+                        embedding = matrix[row]
+                    else:
+                        embedding_path = EMBEDDINGS_DIR / student.embedding_file
+                        if not embedding_path.exists():
+                            continue
+                        embedding = np.load(embedding_path).astype(np.float32)
                     embeddings.append({
                         'student_id': student.id,
                         'student_name': student.name,
                         'embedding': embedding
                     })
-        return embeddings
+            
+            self._emb_cache = embeddings
+            self._emb_data_version = data_version
+            return list(embeddings)
     
     def save_student_embedding(self, student_id: str, embedding: np.ndarray) -> str:
-        """Save student embedding to .npy file."""
+        """Save student embedding (L2-normalized, half precision) to .npy file."""
         filename = f"{student_id}_embedding.npy"
         filepath = EMBEDDINGS_DIR / filename
-        np.save(filepath, embedding)
+        embedding = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        if norm > 0:
+            embedding = embedding / norm
+        with self._lock:
+            _atomic_save(filepath, embedding.astype(EMBEDDING_STORAGE_DTYPE))
+            self._rebuild_embedding_matrix()
         return filename
     
+    def _rebuild_embedding_matrix(self):
+        """Stack every per-student embedding file into ALL_EMBEDDINGS_FILE.
+        
+        Only 1-D vectors of one common length are stacked; anything else keeps
+        being loaded from its own file.
+        """
+        with self._lock:
+            paths = sorted(EMBEDDINGS_DIR.glob("*_embedding.npy"))
+            # Small-file reads are I/O-bound; overlap them instead of loading serially
+            with ThreadPoolExecutor(max_workers=EMBEDDING_LOAD_WORKERS) as executor:
+                loaded = list(executor.map(np.load, paths))
+            
+            vectors = []
+            rows = {}
+            for path, vector in zip(paths, loaded):
+                if vector.ndim != 1 or (vectors and vector.shape != vectors[0].shape):
+                    continue
+                rows[path.name] = len(vectors)
+                vectors.append(vector)
+            
+            if vectors:
+                matrix = np.stack(vectors).astype(EMBEDDING_STORAGE_DTYPE, copy=False)
+            else:
+                matrix = np.empty((0, 0), dtype=EMBEDDING_STORAGE_DTYPE)
+            _atomic_save(ALL_EMBEDDINGS_FILE, matrix)
+            
+            tmp_ids = ALL_EMBEDDING_IDS_FILE.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_ids, 'w') as f:
+                json.dump(rows, f)
+            os.replace(tmp_ids, ALL_EMBEDDING_IDS_FILE)
+            
+            self._emb_cache = None
+    
+    def _load_embedding_matrix(self):
+        """Load the stacked embedding matrix and its filename -> row index."""
+        try:
+            with open(ALL_EMBEDDING_IDS_FILE, 'r') as f:
+                rows = json.load(f)
+            matrix = np.load(ALL_EMBEDDINGS_FILE).astype(np.float32)
+        except (OSError, ValueError):
+            return None, {}
+        return matrix, {name: row for name, row in rows.items() if row < len(matrix)}
+    
     # ===================== SESSIONS =====================
     
     def get_sessions(self, status: str = None, limit: int = None) -> List[Session]:
-        """Get all sessions, optionally filtered by status."""
-        sessions = []
-        if not SESSIONS_FILE.exists():
-            return sessions
-        
-        with open(SESSIONS_FILE, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                # Convert numeric fields
-                row['duration_seconds'] = int(row.get('duration_seconds', 0) or 0)
-                row['peak_students'] = int(row.get('peak_students', 0) or 0)
-                row['avg_attention'] = float(row.get('avg_attention', 0) or 0)
-                row['total_events'] = int(row.get('total_events', 0) or 0)
-                
-                session = Session(**row)
-                if status:
-                    if session.status == status:
-                        sessions.append(session)
-                else:
-                    sessions.append(session)
-        
-        # Sort by created_at descending
-        sessions.sort(key=lambda x: x.created_at, reverse=True)
-        
+        """Get all sessions, optionally filtered by status (newest first)."""
+        sql = f"SELECT {', '.join(SESSION_COLUMNS)} FROM sessions"
+        params = []
+        if status:
+            sql += " WHERE status = ?"
+            params.append(status)
+        sql += " ORDER BY created_at DESC"
         if limit:
-            sessions = sessions[:limit]
+            sql += " LIMIT ?"
+            params.append(limit)
         
-        return sessions
+        return [_from_row(Session, SESSION_COLUMNS, row) for row in self._query(sql, params)]
     
     def get_session(self, session_id: str) -> Optional[Session]:
         """Get a single session by ID."""
-        sessions = self.get_sessions()
-        for s in sessions:
-            if s.id == session_id:
-                return s
-        return None
+        rows = self._query(
+            f"SELECT {', '.join(SESSION_COLUMNS)} FROM sessions WHERE id = ?", (session_id,)
+        )
+        return _from_row(Session, SESSION_COLUMNS, rows[0]) if rows else None
     
     def add_session(self, session: Session) -> Session:
         """Add a new session."""
-        with open(SESSIONS_FILE, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                session.id, session.name, session.course_name, session.room_number,
-                session.description, session.status, session.duration_seconds,
-                session.peak_students, session.avg_attention, session.total_events,
-                session.created_at, session.started_at, session.completed_at
-            ])
+        self._execute(
+            _insert_sql('sessions', SESSION_COLUMNS),
+            SESSION_ROW(session)
+        )
         return session
     
     def update_session(self, session_id: str, updates: Dict) -> Optional[Session]:
         """Update a session's information."""
-        sessions = self.get_sessions()
-        updated_session = None
-        
-        for i, s in enumerate(sessions):
-            if s.id == session_id:
-                for key, value in updates.items():
-                    if hasattr(s, key):
-                        setattr(s, key, value)
-                updated_session = s
-                break
-        
-        if updated_session:
-            self._save_sessions(sessions)
-        
-        return updated_session
+        row = self._update_row('sessions', SESSION_COLUMNS, session_id, updates)
+        return _from_row(Session, SESSION_COLUMNS, row) if row else None
     
     def delete_session(self, session_id: str) -> bool:
         """Delete a session and its related events."""
-        sessions = self.get_sessions()
-        original_len = len(sessions)
-        
-        sessions = [s for s in sessions if s.id != session_id]
-        
-        if len(sessions) < original_len:
-            self._save_sessions(sessions)
-            # Also delete related events
-            self._delete_session_events(session_id)
-            return True
-        
-        return False
-    
-    def _save_sessions(self, sessions: List[Session]):
-        """Save all sessions to CSV (overwrites file)."""
-        with open(SESSIONS_FILE, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                'id', 'name', 'course_name', 'room_number', 'description',
-                'status', 'duration_seconds', 'peak_students', 'avg_attention',
-                'total_events', 'created_at', 'started_at', 'completed_at'
-            ])
-            for s in sessions:
-                writer.writerow([
-                    s.id, s.name, s.course_name, s.room_number, s.description,
-                    s.status, s.duration_seconds, s.peak_students, s.avg_attention,
-                    s.total_events, s.created_at, s.started_at, s.completed_at
-                ])
+        self.flush()
+        with self._lock, self._conn:
+            deleted = self._conn.execute(
+                "DELETE FROM sessions WHERE id = ?", (session_id,)
+            ).rowcount
+            if deleted:
+                # Also delete related events
+                self._conn.execute("DELETE FROM events WHERE session_id = ?", (session_id,))
+        
+        if deleted:
+            self.compact_if_needed()
+        return deleted > 0
     
     # ===================== EVENTS =====================
     
     def get_events(self, session_id: str = None, limit: int = None) -> List[Event]:
-        """Get events, optionally filtered by session."""
-        events = []
-        if not EVENTS_FILE.exists():
-            return events
-        
-        with open(EVENTS_FILE, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                row['track_id'] = int(row.get('track_id', 0) or 0)
-                event = Event(**row)
-                if session_id:
-                    if event.session_id == session_id:
-                        events.append(event)
-                else:
-                    events.append(event)
-        
-        # Sort by timestamp descending
-        events.sort(key=lambda x: x.timestamp, reverse=True)
-        
+        """Get events, optionally filtered by session (newest first)."""
+        if session_id:
+            # Reopened sessions reuse the list until the database changes
+            return list(self._cached(
+                ('events', session_id, limit),
+                lambda: self._query_events(session_id, limit)
+            ))
+        return self._query_events(session_id, limit)
+    
+    def _query_events(self, session_id: str = None, limit: int = None) -> List[Event]:
+        self.flush()
+        sql = f"SELECT {', '.join(EVENT_COLUMNS)} FROM events"
+        params = []
+        if session_id:
+            sql += " WHERE session_id = ?"
+            params.append(session_id)
+        sql += " ORDER BY timestamp DESC, rowid DESC"
         if limit:
-            events = events[:limit]
+            sql += " LIMIT ?"
+            params.append(limit)
         
-        return events
+        return [_from_row(Event, EVENT_COLUMNS, row) for row in self._query(sql, params)]
     
     def add_event(self, event: Event) -> Event:
-        """Add a new event."""
-        with open(EVENTS_FILE, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                event.id, event.session_id, event.student_id, event.student_name,
-                event.track_id, event.event_type, event.details, event.timestamp
-            ])
+        """Add a new event (buffered; see flush())."""
+        self._buffer_insert('events', EVENT_ROW(event))
         return event
     
-    def _delete_session_events(self, session_id: str):
-        """Delete all events for a session."""
-        events = self.get_events()
-        events = [e for e in events if e.session_id != session_id]
-        
-        with open(EVENTS_FILE, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                'id', 'session_id', 'student_id', 'student_name', 'track_id',
-                'event_type', 'details', 'timestamp'
-            ])
-            for e in events:
-                writer.writerow([
-                    e.id, e.session_id, e.student_id, e.student_name,
-                    e.track_id, e.event_type, e.details, e.timestamp
-                ])
-    
     # ===================== ATTENTION LOGS =====================
     
     def add_attention_log(self, log: AttentionLog) -> AttentionLog:
-        """Add a new attention log entry."""
-        with open(ATTENTION_LOGS_FILE, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                log.id, log.session_id, log.student_id, log.student_name,
-                log.track_id, log.attention_score, log.emotion, log.gaze_direction,
-                log.posture, log.phone_detected, log.timestamp
-            ])
+        """Add a new attention log entry (buffered; see flush())."""
+        self._buffer_insert('attention_logs', ATTENTION_LOG_ROW(log))
         return log
     
     def get_attention_logs(self, session_id: str) -> List[AttentionLog]:
         """Get attention logs for a session."""
-        logs = []
-        if not ATTENTION_LOGS_FILE.exists():
-            return logs
-        
-        with open(ATTENTION_LOGS_FILE, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                if row.get('session_id') == session_id:
-                    row['track_id'] = int(row.get('track_id', 0) or 0)
-                    row['attention_score'] = float(row.get('attention_score', 0) or 0)
-                    row['phone_detected'] = row.get('phone_detected', 'False') == 'True'
-                    logs.append(AttentionLog(**row))
-        
+        self.flush()
+        with self._lock:
+            # Build logs straight off the cursor instead of a fetched row list
+            cursor = self._conn.execute(
+                f"SELECT {', '.join(ATTENTION_LOG_COLUMNS)} FROM attention_logs "
+                "WHERE session_id = ? ORDER BY rowid",
+                (session_id,)
+            )
+            logs = [_from_row(AttentionLog, ATTENTION_LOG_COLUMNS, row) for row in cursor]
+        for log in logs:
+            log.phone_detected = bool(log.phone_detected)
         return logs
     
     def get_session_analytics(self, session_id: str) -> Dict:
-        """Compute analytics for a session from attention logs."""
-        logs = self.get_attention_logs(session_id)
-        events = self.get_events(session_id)
+        """Get analytics for a session, cached until the database changes."""
+        return dict(self._cached(
+            ('analytics', session_id),
+            lambda: self._compute_session_analytics(session_id)
+        ))
+    
+    def _compute_session_analytics(self, session_id: str) -> Dict:
+        """Compute analytics for a session with SQL aggregates."""
+        self.flush()
         session = self.get_session(session_id)
         
-        if not logs:
+        # Overall metrics and event counts
+        log_count, avg_attention = self._query(
+            "SELECT COUNT(*), AVG(attention_score) FROM attention_logs WHERE session_id = ?",
+            (session_id,)
+        )[0]
+        total_events, phone_events, posture_events, gaze_events = self._query(
+            "SELECT COUNT(*), "
+            "COALESCE(SUM(event_type = 'phone_detected'), 0), "
+            "COALESCE(SUM(event_type = 'poor_posture'), 0), "
+            "COALESCE(SUM(event_type = 'looking_away'), 0) "
+            "FROM events WHERE session_id = ?",
+            (session_id,)
+        )[0]
+        
+        if not log_count:
             return {
                 'session': session,
                 'avg_attention': 0,
                 'peak_students': 0,
-                'total_events': len(events),
+                'total_events': total_events,
                 'phone_events': 0,
                 'posture_events': 0,
                 'gaze_events': 0,
@@ -493,61 +881,46 @@ class DataManager:
                 'student_analytics': []
             }
         
-        # Overall metrics
-        attention_scores = [log.attention_score for log in logs]
-        avg_attention = sum(attention_scores) / len(attention_scores) if attention_scores else 0
-        
-        # Event counts
-        phone_events = len([e for e in events if e.event_type == 'phone_detected'])
-        posture_events = len([e for e in events if e.event_type == 'poor_posture'])
-        gaze_events = len([e for e in events if e.event_type == 'looking_away'])
-        
-        # Per-student analytics
-        student_data = {}
-        for log in logs:
-            key = log.student_id or f"track_{log.track_id}"
-            if key not in student_data:
-                student_data[key] = {
-                    'name': log.student_name or f"Track {log.track_id}",
-                    'student_id': log.student_id,
-                    'attention_scores': [],
-                    'phone_events': 0,
-                    'posture_events': 0,
-                    'gaze_events': 0
-                }
-            student_data[key]['attention_scores'].append(log.attention_score)
-        
-        # Count events per student
-        for event in events:
-            key = event.student_id or f"track_{event.track_id}"
-            if key in student_data:
-                if event.event_type == 'phone_detected':
-                    student_data[key]['phone_events'] += 1
-                elif event.event_type == 'poor_posture':
-                    student_data[key]['posture_events'] += 1
-                elif event.event_type == 'looking_away':
-                    student_data[key]['gaze_events'] += 1
-        
-        student_analytics = []
-        for key, data in student_data.items():
-            scores = data['attention_scores']
-            student_analytics.append({
-                'name': data['name'],
-                'studentId': data['student_id'],
-                'avgAttention': sum(scores) / len(scores) if scores else 0,
-                'phoneEvents': data['phone_events'],
-                'postureEvents': data['posture_events'],
-                'gazeEvents': data['gaze_events']
-            })
-        
-        # Sort by attention score
-        student_analytics.sort(key=lambda x: x['avgAttention'], reverse=True)
+        # Per-student attention joined with per-student event counts, in one query.
+        # With MIN(rowid), SQLite takes the bare name and track columns from each
+        # student's first log row.
+        rows = self._query(
+            f"""
+            SELECT logs.student_id, logs.student_name, logs.track_id, logs.avg_attention,
+                   COALESCE(ev.phone, 0), COALESCE(ev.posture, 0), COALESCE(ev.gaze, 0)
+            FROM (
+                SELECT {STUDENT_KEY_SQL} AS key, student_id, student_name, track_id,
+                       AVG(attention_score) AS avg_attention, MIN(rowid) AS first_row
+                FROM attention_logs WHERE session_id = ? GROUP BY key
+            ) AS logs
+            LEFT JOIN (
+                SELECT {STUDENT_KEY_SQL} AS key,
+                       SUM(event_type = 'phone_detected') AS phone,
+                       SUM(event_type = 'poor_posture') AS posture,
+                       SUM(event_type = 'looking_away') AS gaze
+                FROM events WHERE session_id = ? GROUP BY key
+            ) AS ev ON ev.key = logs.key
+            ORDER BY logs.avg_attention DESC, logs.first_row
+            """,
+            (session_id, session_id)
+        )
+        student_analytics = [
+            {
+                'name': name or f"Track {track_id}",
+                'studentId': student_id,
+                'avgAttention': avg_score,
+                'phoneEvents': phone,
+                'postureEvents': posture,
+                'gazeEvents': gaze
+            }
+            for student_id, name, track_id, avg_score, phone, posture, gaze in rows
+        ]
         
         return {
             'session': session,
             'avg_attention': avg_attention,
             'peak_students': session.peak_students if session else 0,
-            'total_events': len(events),
+            'total_events': total_events,
             'phone_events': phone_events,
             'posture_events': posture_events,
             'gaze_events': gaze_events,
@@ -555,18 +928,40 @@ class DataManager:
             'student_analytics': student_analytics
         }
     
+    def get_session_bundle(self, session_id: str) -> SessionBundle:
+        """Get a session, its analytics and its events in one read transaction."""
+        with self._lock:
+            # Flush under the lock, so no other thread can buffer rows before
+            # BEGIN and the flushes inside the reads have nothing to commit
+            self.flush()
+            self._conn.execute("BEGIN")
+            try:
+                analytics = self.get_session_analytics(session_id)
+                events = self.get_events(session_id)
+            except BaseException:
+                if self._conn.in_transaction:
+                    self._conn.rollback()
+                raise
+            if self._conn.in_transaction:
+                self._conn.commit()
+        return SessionBundle(analytics['session'], analytics, events)
+    
     # ===================== STATISTICS =====================
     
     def get_dashboard_stats(self) -> Dict:
         """Get statistics for dashboard."""
-        students = self.get_students()
-        sessions = self.get_sessions()
+        total_students, enrolled_students = self._query(
+            "SELECT COUNT(*), COALESCE(SUM(enrollment_status = 'enrolled'), 0) FROM students"
+        )[0]
+        total_sessions, active_sessions = self._query(
+            "SELECT COUNT(*), COALESCE(SUM(status = 'running'), 0) FROM sessions"
+        )[0]
         
         return {
-            'total_students': len(students),
-            'enrolled_students': len([s for s in students if s.enrollment_status == 'enrolled']),
-            'total_sessions': len(sessions),
-            'active_sessions': len([s for s in sessions if s.status == 'running']),
+            'total_students': total_students,
+            'enrolled_students': enrolled_students,
+            'total_sessions': total_sessions,
+            'active_sessions': active_sessions,
             'recent_sessions': self.get_sessions(limit=5)
         }
 
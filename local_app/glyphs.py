@@ -0,0 +1,38 @@
+"""
+Glyph Cache - Emoji and symbol icons rendered once to QPixmaps
+"""
+
+from PyQt6.QtCore import Qt, QRect
+from PyQt6.QtGui import QColor, QFont, QGuiApplication, QPainter, QPixmap
+
+# (glyph, pixel size, color) -> QPixmap; filled on first use since pixmaps
+# need a running QApplication
+_GLYPH_PX = {}
+
+
+def glyph_pixmap(glyph: str, size: int, color: str = "#ffffff") -> QPixmap:
+    """
+    Get a glyph rendered at the given font pixel size. Color only affects
+    monochrome symbols (e.g. "✓"); color emoji keep their own colors.
+    """
+    key = (glyph, size, color)
+    pixmap = _GLYPH_PX.get(key)
+    if pixmap is None:
+        ratio = QGuiApplication.instance().devicePixelRatio()
+        box = round(size * 1.4)
+
+        pixmap = QPixmap(round(box * ratio), round(box * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.GlobalColor.transparent)
+
+        font = QFont()
+        font.setPixelSize(size)
+
+        painter = QPainter(pixmap)
+        painter.setFont(font)
+        painter.setPen(QColor(color))
+        painter.drawText(QRect(0, 0, box, box), Qt.AlignmentFlag.AlignCenter, glyph)
+        painter.end()
+
+        _GLYPH_PX[key] = pixmap
+    return pixmap
@@ -11,15 +11,17 @@ from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QStackedWidget, QPushButton, QLabel, QFrame, QSizePolicy
 )
-from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtCore import Qt, QSize, QTimer
 from PyQt6.QtGui import QIcon, QFont, QPalette, QColor
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from local_app.pages.dashboard import DashboardPage
-from local_app.pages.students import StudentsPage
-from local_app.pages.sessions import SessionsPage
+from local_app.styles import APP_STYLESHEET, dark_palette
+from local_app.glyphs import glyph_pixmap
+
+# Delay before a page shown via the sidebar reloads its data
+REFRESH_DEBOUNCE_MS = 150
 
 
 class SidebarButton(QPushButton):
@@ -27,30 +29,15 @@ class SidebarButton(QPushButton):
     
     def __init__(self, text: str, icon_text: str = "", parent=None):
         super().__init__(parent)
-        self.setText(f"  {icon_text}  {text}")
+        # Emoji drawn as a cached pixmap icon, so only the label text is shaped
+        if icon_text:
+            self.setIcon(QIcon(glyph_pixmap(icon_text, 14)))
+            self.setIconSize(QSize(20, 20))
+        self.setText(f"  {text}")
         self.setCheckable(True)
         self.setFixedHeight(45)
         self.setCursor(Qt.CursorShape.PointingHandCursor)
-        self.setStyleSheet("""
-            QPushButton {
-                background-color: transparent;
-                color: #9ca3af;
-                border: none;
-                border-radius: 8px;
-                text-align: left;
-                padding-left: 12px;
-                font-size: 14px;
-                font-weight: 500;
-            }
-            QPushButton:hover {
-                background-color: #374151;
-                color: #ffffff;
-            }
-            QPushButton:checked {
-                background-color: #4f46e5;
-                color: #ffffff;
-            }
-        """)
+        self.setObjectName("SidebarButton")
 
 
 class Sidebar(QFrame):
@@ -59,12 +46,7 @@ class Sidebar(QFrame):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setFixedWidth(240)
-        self.setStyleSheet("""
-            QFrame {
-                background-color: #1f2937;
-                border-right: 1px solid #374151;
-            }
-        """)
+        self.setObjectName("Sidebar")
         
         layout = QVBoxLayout(self)
         layout.setContentsMargins(12, 12, 12, 12)
@@ -72,14 +54,10 @@ class Sidebar(QFrame):
         
         # Logo/Title
         logo_layout = QHBoxLayout()
-        logo_icon = QLabel("🎓")
-        logo_icon.setStyleSheet("font-size: 28px;")
+        logo_icon = QLabel()
+        logo_icon.setPixmap(glyph_pixmap("🎓", 28))
         logo_text = QLabel("Classroom AI")
-        logo_text.setStyleSheet("""
-            color: #ffffff;
-            font-size: 18px;
-            font-weight: bold;
-        """)
+        logo_text.setObjectName("SidebarLogoText")
         logo_layout.addWidget(logo_icon)
         logo_layout.addWidget(logo_text)
         logo_layout.addStretch()
@@ -88,7 +66,7 @@ class Sidebar(QFrame):
         # Separator
         separator = QFrame()
         separator.setFixedHeight(1)
-        separator.setStyleSheet("background-color: #374151;")
+        separator.setObjectName("SidebarSeparator")
         layout.addWidget(separator)
         layout.addSpacing(12)
         
@@ -108,20 +86,14 @@ class Sidebar(QFrame):
         
         # Bottom info
         info_frame = QFrame()
-        info_frame.setStyleSheet("""
-            QFrame {
-                background-color: #374151;
-                border-radius: 8px;
-                border: none;
-            }
-        """)
+        info_frame.setObjectName("SidebarInfo")
         info_layout = QVBoxLayout(info_frame)
         info_layout.setContentsMargins(12, 12, 12, 12)
         
         status_label = QLabel("● Local Mode")
-        status_label.setStyleSheet("color: #34d399; font-size: 12px;")
+        status_label.setObjectName("SidebarStatus")
         version_label = QLabel("Version 1.0.0")
-        version_label.setStyleSheet("color: #6b7280; font-size: 11px;")
+        version_label.setObjectName("SidebarVersion")
         
         info_layout.addWidget(status_label)
         info_layout.addWidget(version_label)
@@ -143,9 +115,6 @@ class MainWindow(QMainWindow):
         self.setMinimumSize(1280, 720)
         self.resize(1440, 900)
         
-        # Set dark theme
-        self.set_dark_theme()
-        
         # Central widget
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -161,7 +130,7 @@ class MainWindow(QMainWindow):
         
         # Content area
         content_frame = QFrame()
-        content_frame.setStyleSheet("background-color: #111827;")
+        content_frame.setObjectName("ContentArea")
         content_layout = QVBoxLayout(content_frame)
         content_layout.setContentsMargins(0, 0, 0, 0)
         
@@ -169,17 +138,18 @@ class MainWindow(QMainWindow):
         self.stack = QStackedWidget()
         content_layout.addWidget(self.stack)
         
-        # Create pages
-        self.dashboard_page = DashboardPage()
-        self.students_page = StudentsPage()
-        self.sessions_page = SessionsPage()
-        
-        self.stack.addWidget(self.dashboard_page)
-        self.stack.addWidget(self.students_page)
-        self.stack.addWidget(self.sessions_page)
+        # Pages are created on first navigation (see get_page)
+        self.pages = {}
         
         main_layout.addWidget(content_frame)
         
+        # Page refreshes are debounced so rapid tab switching only reloads
+        # the page the user settles on
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(REFRESH_DEBOUNCE_MS)
+        self.refresh_timer.timeout.connect(self.refresh_current_page)
+        
         # Connect navigation
         self.sidebar.btn_dashboard.clicked.connect(lambda: self.navigate_to(0))
         self.sidebar.btn_students.clicked.connect(lambda: self.navigate_to(1))
@@ -188,106 +158,41 @@ class MainWindow(QMainWindow):
         # Set initial page
         self.navigate_to(0)
     
-    def set_dark_theme(self):
-        """Apply dark theme to the application."""
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #111827;
-            }
-            QScrollArea {
-                border: none;
-                background-color: #111827;
-            }
-            QScrollBar:vertical {
-                background-color: #1f2937;
-                width: 12px;
-                border-radius: 6px;
-            }
-            QScrollBar::handle:vertical {
-                background-color: #4b5563;
-                border-radius: 6px;
-                min-height: 20px;
-            }
-            QScrollBar::handle:vertical:hover {
-                background-color: #6b7280;
-            }
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                height: 0px;
-            }
-            QScrollBar:horizontal {
-                background-color: #1f2937;
-                height: 12px;
-                border-radius: 6px;
-            }
-            QScrollBar::handle:horizontal {
-                background-color: #4b5563;
-                border-radius: 6px;
-                min-width: 20px;
-            }
-            QLineEdit, QTextEdit, QSpinBox, QComboBox {
-                background-color: #374151;
-                border: 1px solid #4b5563;
-                border-radius: 8px;
-                padding: 8px 12px;
-                color: #ffffff;
-                font-size: 14px;
-            }
-            QLineEdit:focus, QTextEdit:focus {
-                border-color: #4f46e5;
-            }
-            QComboBox::drop-down {
-                border: none;
-                padding-right: 10px;
-            }
-            QComboBox QAbstractItemView {
-                background-color: #374151;
-                color: #ffffff;
-                selection-background-color: #4f46e5;
-            }
-            QTableWidget {
-                background-color: #1f2937;
-                border: none;
-                gridline-color: #374151;
-                color: #ffffff;
-            }
-            QTableWidget::item {
-                padding: 8px;
-                border-bottom: 1px solid #374151;
-            }
-            QTableWidget::item:selected {
-                background-color: #4f46e5;
-            }
-            QHeaderView::section {
-                background-color: #1f2937;
-                color: #9ca3af;
-                font-weight: bold;
-                padding: 10px;
-                border: none;
-                border-bottom: 1px solid #374151;
-            }
-            QMessageBox {
-                background-color: #1f2937;
-            }
-            QMessageBox QLabel {
-                color: #ffffff;
-            }
-            QDialog {
-                background-color: #1f2937;
-            }
-        """)
+    def get_page(self, index: int):
+        """Get the page for a sidebar index, creating it on first use."""
+        page = self.pages.get(index)
+        if page is None:
+            if index == 0:
+                from local_app.pages.dashboard import DashboardPage
+                page = DashboardPage()
+            elif index == 1:
+                from local_app.pages.students import StudentsPage
+                page = StudentsPage()
+            else:
+                from local_app.pages.sessions import SessionsPage
+                page = SessionsPage()
+            self.pages[index] = page
+            self.stack.addWidget(page)
+        return page
     
     def navigate_to(self, index: int):
         """Navigate to a specific page."""
+        is_new = index not in self.pages
+        page = self.get_page(index)
         self.sidebar.set_active(index)
-        self.stack.setCurrentIndex(index)
+        self.stack.setCurrentWidget(page)
         
-        # Refresh page data
-        if index == 0:
-            self.dashboard_page.refresh_data()
-        elif index == 1:
-            self.students_page.refresh_data()
-        elif index == 2:
-            self.sessions_page.refresh_data()
+        # Refresh page data (a new page has just loaded it)
+        if is_new:
+            self.refresh_timer.stop()
+        else:
+            self.refresh_timer.start()
+    
+    def refresh_current_page(self):
+        """Reload data for the page currently shown."""
+        page = self.stack.currentWidget()
+        if page is not None:
+            page.refresh_data()
     
     def show_session_monitor(self, session_id: str):
         """Open session monitor for a specific session."""
@@ -305,7 +210,7 @@ class MainWindow(QMainWindow):
         """Open enrollment for a specific student."""
         from local_app.pages.enrollment import EnrollmentWindow
         self.enrollment_window = EnrollmentWindow(student_id)
-        self.enrollment_window.closed.connect(self.students_page.refresh_data)
+        self.enrollment_window.closed.connect(self.get_page(1).refresh_data)
         self.enrollment_window.show()
 
 
@@ -314,6 +219,11 @@ def main():
     app = QApplication(sys.argv)
     app.setStyle('Fusion')
     
+    # Dark colors come from the palette; one stylesheet for the whole app,
+    # parsed once, handles the widget-specific styling
+    app.setPalette(dark_palette())
+    app.setStyleSheet(APP_STYLESHEET)
+    
     # Set application font
     font = QFont("Segoe UI", 10)
     app.setFont(font)
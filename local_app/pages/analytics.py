@@ -4,13 +4,15 @@ Analytics Window - Session analytics and reports
 
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QFrame, QPushButton, QTableWidget, QTableWidgetItem,
+    QFrame, QPushButton, QTableView,
     QHeaderView, QFileDialog, QScrollArea, QGridLayout,
     QAbstractItemView
 )
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QColor
+from PyQt6.QtCore import Qt, QRect, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QBrush, QColor, QFont, QPainter
 import csv
+import html
+from collections import Counter
 from datetime import datetime
 
 import sys
@@ -18,6 +20,40 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from data_manager import data_manager
+from background import BackgroundLoader
+from glyphs import glyph_pixmap
+
+# Attention score colors for the student table (high / medium / low), kept as
+# brushes since the view paints ForegroundRole with a QBrush
+ATTENTION_HIGH_BRUSH = QBrush(QColor("#22c55e"))
+ATTENTION_MEDIUM_BRUSH = QBrush(QColor("#eab308"))
+ATTENTION_LOW_BRUSH = QBrush(QColor("#ef4444"))
+
+# Stat card icon colors per variant (only tints monochrome symbols)
+ICON_COLORS = {
+    "primary": "#818cf8",
+    "green": "#34d399",
+    "yellow": "#fbbf24",
+    "blue": "#60a5fa",
+    "red": "#f87171",
+}
+
+# Event distribution colors (per event kind, plus label text and bar track)
+DIST_COLORS = {
+    "phone": QColor("#ef4444"),
+    "posture": QColor("#f97316"),
+    "gaze": QColor("#eab308"),
+    "other": QColor("#6b7280"),
+}
+DIST_LABEL_COLOR = QColor("#d1d5db")
+DIST_TRACK_BRUSH = QBrush(QColor("#374151"))
+
+# Session summary, rendered as one rich-text label (label color comes from
+# the SummaryTable stylesheet rule)
+SUMMARY_ROW_HTML = (
+    '<tr><td style="padding-bottom: 16px;">{}</td>'
+    '<td align="right" style="padding-bottom: 16px; color: #ffffff; font-weight: 500;">{}</td></tr>'
+)
 
 
 class StatCard(QFrame):
@@ -26,22 +62,9 @@ class StatCard(QFrame):
     def __init__(self, icon: str, label: str, value: str, sub_value: str = "", color: str = "primary"):
         super().__init__()
         
-        colors = {
-            "primary": ("#818cf8", "#312e81"),
-            "green": ("#34d399", "#14532d"),
-            "yellow": ("#fbbf24", "#713f12"),
-            "blue": ("#60a5fa", "#1e3a8a"),
-            "red": ("#f87171", "#7f1d1d"),
-        }
-        
-        fg_color, bg_color = colors.get(color, colors["primary"])
-        
-        self.setStyleSheet(f"""
-            QFrame {{
-                background-color: #1f2937;
-                border-radius: 12px;
-            }}
-        """)
+        # Styled by the app stylesheet (styles.py); variant picks the icon colors
+        self.setObjectName("AnalyticsStatCard")
+        self.setProperty("variant", color)
         self.setFixedHeight(140)
         
         layout = QVBoxLayout(self)
@@ -53,16 +76,11 @@ class StatCard(QFrame):
         
         icon_frame = QFrame()
         icon_frame.setFixedSize(48, 48)
-        icon_frame.setStyleSheet(f"""
-            QFrame {{
-                background-color: {bg_color};
-                border-radius: 12px;
-            }}
-        """)
+        icon_frame.setObjectName("StatIcon")
         icon_layout = QVBoxLayout(icon_frame)
         icon_layout.setContentsMargins(0, 0, 0, 0)
-        icon_label = QLabel(icon)
-        icon_label.setStyleSheet(f"font-size: 20px; color: {fg_color};")
+        icon_label = QLabel()
+        icon_label.setPixmap(glyph_pixmap(icon, 20, ICON_COLORS.get(color, ICON_COLORS["primary"])))
         icon_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         icon_layout.addWidget(icon_label)
         
@@ -73,39 +91,190 @@ class StatCard(QFrame):
         
         # Value
         value_label = QLabel(value)
-        value_label.setStyleSheet("color: #ffffff; font-size: 28px; font-weight: bold;")
+        value_label.setObjectName("StatValue")
         layout.addWidget(value_label)
         
         # Label
         label_widget = QLabel(label)
-        label_widget.setStyleSheet("color: #9ca3af; font-size: 13px;")
+        label_widget.setObjectName("StatLabel")
         layout.addWidget(label_widget)
         
         if sub_value:
             sub_label = QLabel(sub_value)
-            sub_label.setStyleSheet("color: #6b7280; font-size: 11px;")
+            sub_label.setObjectName("StatSubValue")
             layout.addWidget(sub_label)
 
 
+class EventDistributionWidget(QWidget):
+    """
+    Event distribution rows (icon, label, count, bar) painted in a single widget
+    instead of a layout of labels and frames per row.
+    """
+    
+    ROW_HEIGHT = 36
+    BAR_WIDTH = 100
+    BAR_HEIGHT = 8
+    COUNT_GAP = 12
+    
+    def __init__(self, rows: list, total: int, parent=None):
+        super().__init__(parent)
+        self.rows = rows  # [(glyph, label, count, QColor)]
+        self.total = total
+        self.setMinimumHeight(len(rows) * self.ROW_HEIGHT)
+        
+        self.label_font = QFont(self.font())
+        self.label_font.setPixelSize(14)
+        self.count_font = QFont(self.font())
+        self.count_font.setPixelSize(16)
+        self.count_font.setBold(True)
+    
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        
+        width = self.width()
+        bar_x = width - self.BAR_WIDTH
+        text_width = bar_x - self.COUNT_GAP
+        valign = Qt.AlignmentFlag.AlignVCenter
+        
+        for i, (glyph, label, count, color) in enumerate(self.rows):
+            top = i * self.ROW_HEIGHT
+            text_rect = QRect(0, top, text_width, self.ROW_HEIGHT)
+            
+            icon = glyph_pixmap(glyph, 14)
+            icon_size = icon.deviceIndependentSize()
+            painter.drawPixmap(0, top + int(self.ROW_HEIGHT - icon_size.height()) // 2, icon)
+            
+            label_rect = text_rect.adjusted(int(icon_size.width()) + 6, 0, 0, 0)
+            painter.setFont(self.label_font)
+            painter.setPen(DIST_LABEL_COLOR)
+            painter.drawText(label_rect, valign | Qt.AlignmentFlag.AlignLeft, label)
+            
+            painter.setFont(self.count_font)
+            painter.setPen(color)
+            painter.drawText(text_rect, valign | Qt.AlignmentFlag.AlignRight, str(count))
+            
+            # Bar track and fill
+            bar_y = top + (self.ROW_HEIGHT - self.BAR_HEIGHT) // 2
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(DIST_TRACK_BRUSH)
+            painter.drawRoundedRect(bar_x, bar_y, self.BAR_WIDTH, self.BAR_HEIGHT, 4, 4)
+            
+            if self.total > 0:
+                bar_width = int((count / self.total) * self.BAR_WIDTH)
+                if bar_width > 0:
+                    painter.setBrush(color)
+                    painter.drawRoundedRect(bar_x, bar_y, bar_width, self.BAR_HEIGHT, 4, 4)
+        
+        painter.end()
+
+
+class StudentAnalyticsModel(QAbstractTableModel):
+    """
+    Student performance rows for the analytics table. Rows are handed to the
+    view in batches as it scrolls (fetchMore) rather than all up front.
+    """
+    
+    HEADERS = ["Student", "Avg Attention", "Phone Events", "Posture Events", "Gaze Events", "Time in Frame"]
+    COUNT_KEYS = {2: 'phoneEvents', 3: 'postureEvents', 4: 'gazeEvents'}
+    BATCH_SIZE = 50
+    
+    def __init__(self, students: list, parent=None):
+        super().__init__(parent)
+        self.students = students
+        self.loaded = 0
+    
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
+    
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+    
+    def canFetchMore(self, parent):
+        return not parent.isValid() and self.loaded < len(self.students)
+    
+    def fetchMore(self, parent):
+        if parent.isValid():
+            return
+        count = min(self.BATCH_SIZE, len(self.students) - self.loaded)
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+    
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        student = self.students[index.row()]
+        column = index.column()
+        
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return student.get('name', 'Unknown')
+            if column == 1:
+                return f"{student.get('avgAttention', 0):.1f}%"
+            if column == 5:
+                return "N/A"
+            return str(student.get(self.COUNT_KEYS[column], 0))
+        
+        if role == Qt.ItemDataRole.ForegroundRole and column == 1:
+            attention = student.get('avgAttention', 0)
+            if attention >= 70:
+                return ATTENTION_HIGH_BRUSH
+            elif attention >= 40:
+                return ATTENTION_MEDIUM_BRUSH
+            return ATTENTION_LOW_BRUSH
+        
+        return None
+    
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+
 class AnalyticsWindow(QMainWindow):
     """Session analytics window."""
     
     def __init__(self, session_id: str):
         super().__init__()
         self.session_id = session_id
-        self.session = data_manager.get_session(session_id)
-        self.analytics = data_manager.get_session_analytics(session_id)
-        self.events = data_manager.get_events(session_id)
+        self.session = None
+        self.analytics = {}
+        self.events = []
+        
+        self.setWindowTitle("Analytics")
+        self.setMinimumSize(1200, 800)
+        self.setObjectName("AnalyticsWindow")
+        
+        # Placeholder until the session data has loaded
+        self.loading_label = QLabel("Loading analytics...")
+        self.loading_label.setObjectName("LoadingLabel")
+        self.loading_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.setCentralWidget(self.loading_label)
+        
+        self.loader = BackgroundLoader(self.show_data, self, on_error=self.show_error)
+        self.loader.load(self.load_data, session_id)
+    
+    @staticmethod
+    def load_data(session_id: str):
+        """Fetch everything the window shows (runs off the GUI thread)."""
+        return data_manager.get_session_bundle(session_id)
+    
+    def show_data(self, bundle):
+        """Build the analytics UI once the data has loaded."""
+        self.session = bundle.session
+        self.analytics = bundle.analytics
+        self.events = bundle.events
         
         if not self.session:
+            self.loading_label.setText("Session not found")
             return
         
         self.setWindowTitle(f"Analytics: {self.session.name}")
-        self.setMinimumSize(1200, 800)
-        self.setStyleSheet("background-color: #111827;")
-        
         self.setup_ui()
     
+    def show_error(self, message: str):
+        """Replace the loading placeholder when the data could not be loaded."""
+        self.loading_label.setText(f"Could not load analytics: {message}")
+    
     def setup_ui(self):
         """Setup the analytics UI."""
         central = QWidget()
@@ -119,18 +288,7 @@ class AnalyticsWindow(QMainWindow):
         header_layout = QHBoxLayout()
         
         back_btn = QPushButton("← Back to Sessions")
-        back_btn.setStyleSheet("""
-            QPushButton {
-                background-color: transparent;
-                color: #9ca3af;
-                border: none;
-                font-size: 14px;
-                padding: 8px 0;
-            }
-            QPushButton:hover {
-                color: #ffffff;
-            }
-        """)
+        back_btn.setObjectName("BackButton")
         back_btn.setCursor(Qt.CursorShape.PointingHandCursor)
         back_btn.clicked.connect(self.close)
         header_layout.addWidget(back_btn)
@@ -139,19 +297,7 @@ class AnalyticsWindow(QMainWindow):
         
         # Export buttons
         export_csv_btn = QPushButton("📄  Export CSV")
-        export_csv_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #374151;
-                color: #ffffff;
-                border: none;
-                border-radius: 8px;
-                padding: 10px 20px;
-                font-size: 13px;
-            }
-            QPushButton:hover {
-                background-color: #4b5563;
-            }
-        """)
+        export_csv_btn.setObjectName("ExportButton")
         export_csv_btn.setCursor(Qt.CursorShape.PointingHandCursor)
         export_csv_btn.clicked.connect(self.export_csv)
         header_layout.addWidget(export_csv_btn)
@@ -160,12 +306,7 @@ class AnalyticsWindow(QMainWindow):
         
         # Session info
         info_frame = QFrame()
-        info_frame.setStyleSheet("""
-            QFrame {
-                background-color: #1f2937;
-                border-radius: 12px;
-            }
-        """)
+        info_frame.setObjectName("Panel")
         info_layout = QHBoxLayout(info_frame)
         info_layout.setContentsMargins(24, 20, 24, 20)
         
@@ -173,29 +314,20 @@ class AnalyticsWindow(QMainWindow):
         title_layout = QVBoxLayout()
         
         title = QLabel(self.session.name)
-        title.setStyleSheet("color: #ffffff; font-size: 22px; font-weight: bold;")
+        title.setObjectName("SessionTitle")
         title_layout.addWidget(title)
         
         details = QLabel(f"{self.session.course_name} • {self.session.created_at[:10]}")
-        details.setStyleSheet("color: #9ca3af; font-size: 14px;")
+        details.setObjectName("SessionDetails")
         title_layout.addWidget(details)
         
         info_layout.addLayout(title_layout)
         info_layout.addStretch()
         
         # Duration badge
-        duration_mins = self.session.duration_seconds // 60
-        duration_badge = QLabel(f"⏱ {duration_mins} minutes")
-        duration_badge.setStyleSheet("""
-            QLabel {
-                background-color: #312e81;
-                color: #818cf8;
-                padding: 8px 16px;
-                border-radius: 8px;
-                font-size: 14px;
-                font-weight: 500;
-            }
-        """)
+        duration_text = f"{self.session.duration_seconds // 60} minutes"
+        duration_badge = QLabel(f"⏱ {duration_text}")
+        duration_badge.setObjectName("DurationBadge")
         info_layout.addWidget(duration_badge)
         
         main_layout.addWidget(info_frame)
@@ -203,10 +335,10 @@ class AnalyticsWindow(QMainWindow):
         # Scroll area for content
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
-        scroll.setStyleSheet("QScrollArea { border: none; background: transparent; }")
+        scroll.setObjectName("AnalyticsScroll")
         
         scroll_content = QWidget()
-        scroll_content.setStyleSheet("background: transparent;")
+        scroll_content.setObjectName("AnalyticsContent")
         content_layout = QVBoxLayout(scroll_content)
         content_layout.setContentsMargins(0, 0, 0, 0)
         content_layout.setSpacing(24)
@@ -216,13 +348,15 @@ class AnalyticsWindow(QMainWindow):
         stats_layout.setSpacing(16)
         
         avg_attention = self.analytics.get('avg_attention', 0)
+        attention_text = f"{avg_attention:.1f}%"
         peak_students = self.analytics.get('peak_students', self.session.peak_students)
         total_events = len(self.events)
-        phone_events = len([e for e in self.events if e.event_type == 'phone_detected'])
-        posture_events = len([e for e in self.events if e.event_type == 'poor_posture'])
-        gaze_events = len([e for e in self.events if e.event_type == 'looking_away'])
+        event_counts = Counter(e.event_type for e in self.events)
+        phone_events = event_counts['phone_detected']
+        posture_events = event_counts['poor_posture']
+        gaze_events = event_counts['looking_away']
         
-        stats_layout.addWidget(StatCard("👁", "Avg Attention", f"{avg_attention:.1f}%", "", "green"))
+        stats_layout.addWidget(StatCard("👁", "Avg Attention", attention_text, "", "green"))
         stats_layout.addWidget(StatCard("👥", "Peak Students", str(peak_students), "", "primary"))
         stats_layout.addWidget(StatCard("📱", "Phone Events", str(phone_events), "", "red"))
         stats_layout.addWidget(StatCard("🪑", "Posture Events", str(posture_events), "", "yellow"))
@@ -236,73 +370,39 @@ class AnalyticsWindow(QMainWindow):
         
         # Event distribution
         dist_frame = QFrame()
-        dist_frame.setStyleSheet("""
-            QFrame {
-                background-color: #1f2937;
-                border-radius: 12px;
-            }
-        """)
+        dist_frame.setObjectName("Panel")
         dist_layout = QVBoxLayout(dist_frame)
         dist_layout.setContentsMargins(20, 20, 20, 20)
         dist_layout.setSpacing(16)
         
         dist_title = QLabel("Event Distribution")
-        dist_title.setStyleSheet("color: #ffffff; font-size: 16px; font-weight: 600;")
+        dist_title.setObjectName("PanelTitle")
         dist_layout.addWidget(dist_title)
         
-        # Simple text-based distribution
+        # Painted distribution rows
         event_types = [
-            ("📱 Phone Usage", phone_events, "#ef4444"),
-            ("🪑 Poor Posture", posture_events, "#f97316"),
-            ("👀 Looking Away", gaze_events, "#eab308"),
-            ("📊 Other", total_events - phone_events - posture_events - gaze_events, "#6b7280")
+            ("📱", "Phone Usage", phone_events, "phone"),
+            ("🪑", "Poor Posture", posture_events, "posture"),
+            ("👀", "Looking Away", gaze_events, "gaze"),
+            ("📊", "Other", total_events - phone_events - posture_events - gaze_events, "other")
         ]
-        
-        for label, count, color in event_types:
-            row = QHBoxLayout()
-            
-            label_widget = QLabel(label)
-            label_widget.setStyleSheet("color: #d1d5db; font-size: 14px;")
-            row.addWidget(label_widget)
-            
-            row.addStretch()
-            
-            count_widget = QLabel(str(count))
-            count_widget.setStyleSheet(f"color: {color}; font-size: 16px; font-weight: bold;")
-            row.addWidget(count_widget)
-            
-            # Simple bar
-            bar_container = QFrame()
-            bar_container.setFixedSize(100, 8)
-            bar_container.setStyleSheet("background-color: #374151; border-radius: 4px;")
-            
-            if total_events > 0:
-                bar_width = int((count / total_events) * 100)
-                bar = QFrame(bar_container)
-                bar.setGeometry(0, 0, bar_width, 8)
-                bar.setStyleSheet(f"background-color: {color}; border-radius: 4px;")
-            
-            row.addWidget(bar_container)
-            
-            dist_layout.addLayout(row)
+        dist_layout.addWidget(EventDistributionWidget(
+            [(glyph, label, count, DIST_COLORS[kind]) for glyph, label, count, kind in event_types],
+            total_events
+        ))
         
         dist_layout.addStretch()
         columns_layout.addWidget(dist_frame, stretch=1)
         
         # Session summary
         summary_frame = QFrame()
-        summary_frame.setStyleSheet("""
-            QFrame {
-                background-color: #1f2937;
-                border-radius: 12px;
-            }
-        """)
+        summary_frame.setObjectName("Panel")
         summary_layout = QVBoxLayout(summary_frame)
         summary_layout.setContentsMargins(20, 20, 20, 20)
         summary_layout.setSpacing(16)
         
         summary_title = QLabel("Session Summary")
-        summary_title.setStyleSheet("color: #ffffff; font-size: 16px; font-weight: 600;")
+        summary_title.setObjectName("PanelTitle")
         summary_layout.addWidget(summary_title)
         
         # Summary items
@@ -311,26 +411,23 @@ class AnalyticsWindow(QMainWindow):
             ("Course", self.session.course_name),
             ("Room", self.session.room_number or "N/A"),
             ("Date", self.session.created_at[:10]),
-            ("Duration", f"{duration_mins} minutes"),
+            ("Duration", duration_text),
             ("Total Events", str(total_events)),
             ("Students Detected", str(peak_students)),
-            ("Avg Attention", f"{avg_attention:.1f}%"),
+            ("Avg Attention", attention_text),
         ]
         
-        for label, value in summary_items:
-            row = QHBoxLayout()
-            
-            label_widget = QLabel(label)
-            label_widget.setStyleSheet("color: #9ca3af; font-size: 13px;")
-            row.addWidget(label_widget)
-            
-            row.addStretch()
-            
-            value_widget = QLabel(value)
-            value_widget.setStyleSheet("color: #ffffff; font-size: 13px; font-weight: 500;")
-            row.addWidget(value_widget)
-            
-            summary_layout.addLayout(row)
+        summary_label = QLabel(
+            '<table width="100%" cellspacing="0" cellpadding="0">'
+            + ''.join(
+                SUMMARY_ROW_HTML.format(html.escape(label), html.escape(value))
+                for label, value in summary_items
+            )
+            + '</table>'
+        )
+        summary_label.setObjectName("SummaryTable")
+        summary_label.setTextFormat(Qt.TextFormat.RichText)
+        summary_layout.addWidget(summary_label)
         
         summary_layout.addStretch()
         columns_layout.addWidget(summary_frame, stretch=1)
@@ -339,82 +436,29 @@ class AnalyticsWindow(QMainWindow):
         
         # Student performance table
         table_frame = QFrame()
-        table_frame.setStyleSheet("""
-            QFrame {
-                background-color: #1f2937;
-                border-radius: 12px;
-            }
-        """)
+        table_frame.setObjectName("Panel")
         table_layout = QVBoxLayout(table_frame)
         table_layout.setContentsMargins(20, 20, 20, 20)
         table_layout.setSpacing(16)
         
         table_title = QLabel("Student Performance")
-        table_title.setStyleSheet("color: #ffffff; font-size: 16px; font-weight: 600;")
+        table_title.setObjectName("PanelTitle")
         table_layout.addWidget(table_title)
         
-        self.student_table = QTableWidget()
-        self.student_table.setColumnCount(6)
-        self.student_table.setHorizontalHeaderLabels([
-            "Student", "Avg Attention", "Phone Events", "Posture Events", "Gaze Events", "Time in Frame"
-        ])
+        # Rows come from a lazy model, so no per-cell items are created up front
+        self.student_table = QTableView()
+        self.student_table.setObjectName("StudentTable")
+        self.student_model = StudentAnalyticsModel(self.analytics.get('student_analytics', []), self)
+        self.student_table.setModel(self.student_model)
         
         header = self.student_table.horizontalHeader()
-        header.setStyleSheet("""
-            QHeaderView::section {
-                background-color: #1f2937;
-                color: #9ca3af;
-                font-weight: bold;
-                padding: 12px;
-                border: none;
-                border-bottom: 1px solid #374151;
-            }
-        """)
-        for i in range(6):
+        for i in range(len(StudentAnalyticsModel.HEADERS)):
             header.setSectionResizeMode(i, QHeaderView.ResizeMode.Stretch)
         
         self.student_table.verticalHeader().setVisible(False)
+        self.student_table.verticalHeader().setDefaultSectionSize(48)
         self.student_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.student_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
-        self.student_table.setStyleSheet("""
-            QTableWidget {
-                background-color: #1f2937;
-                border: none;
-                gridline-color: #374151;
-            }
-            QTableWidget::item {
-                padding: 10px;
-                color: #ffffff;
-                border-bottom: 1px solid #374151;
-            }
-            QTableWidget::item:selected {
-                background-color: #4f46e5;
-            }
-        """)
-        
-        # Populate table
-        student_analytics = self.analytics.get('student_analytics', [])
-        self.student_table.setRowCount(len(student_analytics))
-        
-        for row, student in enumerate(student_analytics):
-            self.student_table.setItem(row, 0, QTableWidgetItem(student.get('name', 'Unknown')))
-            
-            attention = student.get('avgAttention', 0)
-            attention_item = QTableWidgetItem(f"{attention:.1f}%")
-            if attention >= 70:
-                attention_item.setForeground(QColor("#22c55e"))
-            elif attention >= 40:
-                attention_item.setForeground(QColor("#eab308"))
-            else:
-                attention_item.setForeground(QColor("#ef4444"))
-            self.student_table.setItem(row, 1, attention_item)
-            
-            self.student_table.setItem(row, 2, QTableWidgetItem(str(student.get('phoneEvents', 0))))
-            self.student_table.setItem(row, 3, QTableWidgetItem(str(student.get('postureEvents', 0))))
-            self.student_table.setItem(row, 4, QTableWidgetItem(str(student.get('gazeEvents', 0))))
-            self.student_table.setItem(row, 5, QTableWidgetItem("N/A"))
-            
-            self.student_table.setRowHeight(row, 48)
         
         table_layout.addWidget(self.student_table)
         
@@ -435,48 +479,52 @@ class AnalyticsWindow(QMainWindow):
         if not filename:
             return
         
-        with open(filename, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            
+        # Every row is built up front and written with one writerows() call
+        rows = [
             # Session info
-            writer.writerow(["Session Analytics Report"])
-            writer.writerow([])
-            writer.writerow(["Session Name", self.session.name])
-            writer.writerow(["Course", self.session.course_name])
-            writer.writerow(["Date", self.session.created_at[:10]])
-            writer.writerow(["Duration (minutes)", self.session.duration_seconds // 60])
-            writer.writerow([])
+            ["Session Analytics Report"],
+            [],
+            ["Session Name", self.session.name],
+            ["Course", self.session.course_name],
+            ["Date", self.session.created_at[:10]],
+            ["Duration (minutes)", self.session.duration_seconds // 60],
+            [],
             
             # Summary stats
-            writer.writerow(["Summary Statistics"])
-            writer.writerow(["Average Attention", f"{self.analytics.get('avg_attention', 0):.1f}%"])
-            writer.writerow(["Peak Students", self.session.peak_students])
-            writer.writerow(["Total Events", len(self.events)])
-            writer.writerow([])
+            ["Summary Statistics"],
+            ["Average Attention", f"{self.analytics.get('avg_attention', 0):.1f}%"],
+            ["Peak Students", self.session.peak_students],
+            ["Total Events", len(self.events)],
+            [],
             
             # Student performance
-            writer.writerow(["Student Performance"])
-            writer.writerow(["Student", "Avg Attention", "Phone Events", "Posture Events", "Gaze Events"])
-            
-            for student in self.analytics.get('student_analytics', []):
-                writer.writerow([
-                    student.get('name', 'Unknown'),
-                    f"{student.get('avgAttention', 0):.1f}%",
-                    student.get('phoneEvents', 0),
-                    student.get('postureEvents', 0),
-                    student.get('gazeEvents', 0)
-                ])
-            
-            writer.writerow([])
-            
-            # Events log
-            writer.writerow(["Events Log"])
-            writer.writerow(["Time", "Student", "Event Type", "Details"])
-            
-            for event in self.events:
-                writer.writerow([
-                    event.timestamp,
-                    event.student_name or f"Track {event.track_id}",
-                    event.event_type,
-                    event.details
-                ])
+            ["Student Performance"],
+            ["Student", "Avg Attention", "Phone Events", "Posture Events", "Gaze Events"],
+        ]
+        rows.extend(
+            (
+                student.get('name', 'Unknown'),
+                f"{student.get('avgAttention', 0):.1f}%",
+                student.get('phoneEvents', 0),
+                student.get('postureEvents', 0),
+                student.get('gazeEvents', 0)
+            )
+            for student in self.analytics.get('student_analytics', [])
+        )
+        
+        # Events log
+        rows.append([])
+        rows.append(["Events Log"])
+        rows.append(["Time", "Student", "Event Type", "Details"])
+        rows.extend(
+            (
+                event.timestamp,
+                event.student_name or f"Track {event.track_id}",
+                event.event_type,
+                event.details
+            )
+            for event in self.events
+        )
+        
+        with open(filename, 'w', newline='', encoding='utf-8', buffering=1 << 20) as f:
+            csv.writer(f).writerows(rows)
@@ -14,6 +14,28 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from data_manager import data_manager
+from background import BackgroundLoader
+from glyphs import glyph_pixmap
+
+# Stat card icon colors per variant (only tints monochrome symbols)
+ICON_COLORS = {
+    "primary": "#4f46e5",
+    "green": "#22c55e",
+    "yellow": "#eab308",
+    "blue": "#3b82f6",
+    "red": "#ef4444",
+}
+
+# Recent session status dot stylesheets, built once per status
+STATUS_DOT_QSS = {
+    status: f"color: {color}; font-size: 10px;"
+    for status, color in {
+        "created": "#6b7280",
+        "running": "#22c55e",
+        "paused": "#eab308",
+        "completed": "#3b82f6",
+    }.items()
+}
 
 
 class StatCard(QFrame):
@@ -22,23 +44,9 @@ class StatCard(QFrame):
     def __init__(self, icon: str, label: str, value: str, sub_value: str = "", color: str = "primary"):
         super().__init__()
         
-        colors = {
-            "primary": ("#4f46e5", "#312e81"),
-            "green": ("#22c55e", "#14532d"),
-            "yellow": ("#eab308", "#713f12"),
-            "blue": ("#3b82f6", "#1e3a8a"),
-            "red": ("#ef4444", "#7f1d1d"),
-        }
-        
-        fg_color, bg_color = colors.get(color, colors["primary"])
-        
-        self.setStyleSheet(f"""
-            QFrame {{
-                background-color: #1f2937;
-                border-radius: 12px;
-                padding: 8px;
-            }}
-        """)
+        # Styled by the app stylesheet (styles.py); variant picks the icon colors
+        self.setObjectName("StatCard")
+        self.setProperty("variant", color)
         self.setFixedHeight(120)
         
         layout = QHBoxLayout(self)
@@ -48,16 +56,11 @@ class StatCard(QFrame):
         # Icon container
         icon_frame = QFrame()
         icon_frame.setFixedSize(56, 56)
-        icon_frame.setStyleSheet(f"""
-            QFrame {{
-                background-color: {bg_color};
-                border-radius: 12px;
-            }}
-        """)
+        icon_frame.setObjectName("StatIcon")
         icon_layout = QVBoxLayout(icon_frame)
         icon_layout.setContentsMargins(0, 0, 0, 0)
-        icon_label = QLabel(icon)
-        icon_label.setStyleSheet(f"font-size: 24px; color: {fg_color};")
+        icon_label = QLabel()
+        icon_label.setPixmap(glyph_pixmap(icon, 24, ICON_COLORS.get(color, ICON_COLORS["primary"])))
         icon_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         icon_layout.addWidget(icon_label)
         
@@ -68,17 +71,17 @@ class StatCard(QFrame):
         text_layout.setSpacing(4)
         
         label_widget = QLabel(label)
-        label_widget.setStyleSheet("color: #9ca3af; font-size: 14px;")
+        label_widget.setObjectName("StatLabel")
         
         self.value_label = QLabel(value)
-        self.value_label.setStyleSheet("color: #ffffff; font-size: 28px; font-weight: bold;")
+        self.value_label.setObjectName("StatValue")
         
         text_layout.addWidget(label_widget)
         text_layout.addWidget(self.value_label)
         
         if sub_value:
             self.sub_label = QLabel(sub_value)
-            self.sub_label.setStyleSheet("color: #6b7280; font-size: 12px;")
+            self.sub_label.setObjectName("StatSubValue")
             text_layout.addWidget(self.sub_label)
         else:
             self.sub_label = None
@@ -99,15 +102,6 @@ class RecentSessionCard(QFrame):
     def __init__(self, session, on_click=None):
         super().__init__()
         
-        status_colors = {
-            "created": "#6b7280",
-            "running": "#22c55e",
-            "paused": "#eab308",
-            "completed": "#3b82f6",
-        }
-        
-        status_color = status_colors.get(session.status, "#6b7280")
-        
         self.setStyleSheet("""
             QFrame {
                 background-color: #374151;
@@ -124,7 +118,7 @@ class RecentSessionCard(QFrame):
         
         # Status indicator
         status_dot = QLabel("●")
-        status_dot.setStyleSheet(f"color: {status_color}; font-size: 10px;")
+        status_dot.setStyleSheet(STATUS_DOT_QSS.get(session.status, STATUS_DOT_QSS["created"]))
         layout.addWidget(status_dot)
         
         # Session info
@@ -162,6 +156,7 @@ class DashboardPage(QWidget):
     
     def __init__(self):
         super().__init__()
+        self.loader = BackgroundLoader(self.show_stats, self)
         self.setup_ui()
     
     def setup_ui(self):
@@ -325,9 +320,11 @@ class DashboardPage(QWidget):
         self.refresh_data()
     
     def refresh_data(self):
-        """Refresh dashboard data from CSV."""
-        stats = data_manager.get_dashboard_stats()
-        
+        """Refresh dashboard data (queried off the GUI thread)."""
+        self.loader.load(data_manager.get_dashboard_stats)
+    
+    def show_stats(self, stats: dict):
+        """Show freshly loaded dashboard stats."""
         self.card_total_students.update_value(
             str(stats['total_students']),
             f"{stats['enrolled_students']} enrolled"
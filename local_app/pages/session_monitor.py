@@ -20,6 +20,32 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from data_manager import data_manager, Event, AttentionLog
+from glyphs import glyph_pixmap
+
+# Event list item look per event type ('other' for anything else)
+EVENT_CONFIG = {
+    'phone_detected': {'icon': '📱', 'color': '#ef4444', 'bg': '#7f1d1d'},
+    'poor_posture': {'icon': '🪑', 'color': '#f97316', 'bg': '#7c2d12'},
+    'looking_away': {'icon': '👀', 'color': '#eab308', 'bg': '#713f12'},
+    'attention_drop': {'icon': '📉', 'color': '#eab308', 'bg': '#713f12'},
+    'student_identified': {'icon': '✓', 'color': '#22c55e', 'bg': '#14532d'},
+    'other': {'icon': '●', 'color': '#6b7280', 'bg': '#374151'},
+}
+
+# Event item stylesheets, built once per event type instead of per item
+EVENT_ITEM_QSS = {
+    kind: f"""
+            QFrame {{
+                background-color: {config['bg']};
+                border-radius: 8px;
+            }}
+        """
+    for kind, config in EVENT_CONFIG.items()
+}
+EVENT_TITLE_QSS = {
+    kind: f"color: {config['color']}; font-size: 12px; font-weight: 500;"
+    for kind, config in EVENT_CONFIG.items()
+}
 
 
 class MonitoringThread(QThread):
@@ -165,22 +191,12 @@ class EventItem(QFrame):
     def __init__(self, event: dict):
         super().__init__()
         
-        event_config = {
-            'phone_detected': {'icon': '📱', 'color': '#ef4444', 'bg': '#7f1d1d'},
-            'poor_posture': {'icon': '🪑', 'color': '#f97316', 'bg': '#7c2d12'},
-            'looking_away': {'icon': '👀', 'color': '#eab308', 'bg': '#713f12'},
-            'attention_drop': {'icon': '📉', 'color': '#eab308', 'bg': '#713f12'},
-            'student_identified': {'icon': '✓', 'color': '#22c55e', 'bg': '#14532d'},
-        }
+        kind = event.get('type', '')
+        if kind not in EVENT_CONFIG:
+            kind = 'other'
+        config = EVENT_CONFIG[kind]
         
-        config = event_config.get(event.get('type', ''), {'icon': '●', 'color': '#6b7280', 'bg': '#374151'})
-        
-        self.setStyleSheet(f"""
-            QFrame {{
-                background-color: {config['bg']};
-                border-radius: 8px;
-            }}
-        """)
+        self.setStyleSheet(EVENT_ITEM_QSS[kind])
         
         layout = QHBoxLayout(self)
         layout.setContentsMargins(12, 8, 12, 8)
@@ -197,7 +213,7 @@ class EventItem(QFrame):
         event_type = event.get('type', 'event').replace('_', ' ').title()
         
         title = QLabel(f"{name} - {event_type}")
-        title.setStyleSheet(f"color: {config['color']}; font-size: 12px; font-weight: 500;")
+        title.setStyleSheet(EVENT_TITLE_QSS[kind])
         
         time_str = datetime.now().strftime("%H:%M:%S")
         time_label = QLabel(time_str)
@@ -268,13 +284,13 @@ class StudentCard(QFrame):
         
         # Status icons
         if data.get('phone_detected'):
-            phone_icon = QLabel("📱")
-            phone_icon.setStyleSheet("font-size: 14px;")
+            phone_icon = QLabel()
+            phone_icon.setPixmap(glyph_pixmap("📱", 14))
             layout.addWidget(phone_icon)
         
         if data.get('looking_away'):
-            gaze_icon = QLabel("👀")
-            gaze_icon.setStyleSheet("font-size: 14px;")
+            gaze_icon = QLabel()
+            gaze_icon.setPixmap(glyph_pixmap("👀", 14))
             layout.addWidget(gaze_icon)
 
 
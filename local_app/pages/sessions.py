@@ -15,6 +15,30 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from data_manager import data_manager, Session
+from background import BackgroundLoader
+
+# Status badge colors and labels, by session status
+STATUS_CONFIG = {
+    "created": {"color": "#6b7280", "bg": "#374151", "label": "Created"},
+    "running": {"color": "#22c55e", "bg": "#14532d", "label": "Running"},
+    "paused": {"color": "#eab308", "bg": "#713f12", "label": "Paused"},
+    "completed": {"color": "#3b82f6", "bg": "#1e3a8a", "label": "Completed"},
+}
+
+# Status badge stylesheets, built once per status instead of per card
+STATUS_BADGE_QSS = {
+    status: f"""
+            QLabel {{
+                background-color: {config["bg"]};
+                color: {config["color"]};
+                padding: 4px 12px;
+                border-radius: 12px;
+                font-size: 12px;
+                font-weight: 500;
+            }}
+        """
+    for status, config in STATUS_CONFIG.items()
+}
 
 
 class CreateSessionDialog(QDialog):
@@ -155,14 +179,8 @@ class SessionCard(QFrame):
         self.on_analytics = on_analytics
         self.on_delete = on_delete
         
-        status_config = {
-            "created": {"color": "#6b7280", "bg": "#374151", "label": "Created"},
-            "running": {"color": "#22c55e", "bg": "#14532d", "label": "Running"},
-            "paused": {"color": "#eab308", "bg": "#713f12", "label": "Paused"},
-            "completed": {"color": "#3b82f6", "bg": "#1e3a8a", "label": "Completed"},
-        }
-        
-        status = status_config.get(session.status, status_config["created"])
+        status_key = session.status if session.status in STATUS_CONFIG else "created"
+        status = STATUS_CONFIG[status_key]
         
         self.setStyleSheet("""
             QFrame {
@@ -186,16 +204,7 @@ class SessionCard(QFrame):
         header_layout.addStretch()
         
         status_label = QLabel(status["label"])
-        status_label.setStyleSheet(f"""
-            QLabel {{
-                background-color: {status["bg"]};
-                color: {status["color"]};
-                padding: 4px 12px;
-                border-radius: 12px;
-                font-size: 12px;
-                font-weight: 500;
-            }}
-        """)
+        status_label.setStyleSheet(STATUS_BADGE_QSS[status_key])
         header_layout.addWidget(status_label)
         
         layout.addLayout(header_layout)
@@ -321,6 +330,7 @@ class SessionsPage(QWidget):
     
     def __init__(self):
         super().__init__()
+        self.loader = BackgroundLoader(self.show_sessions, self)
         self.setup_ui()
     
     def setup_ui(self):
@@ -384,15 +394,17 @@ class SessionsPage(QWidget):
         self.refresh_data()
     
     def refresh_data(self):
-        """Refresh sessions from CSV."""
+        """Refresh sessions (queried off the GUI thread)."""
+        self.loader.load(data_manager.get_sessions)
+    
+    def show_sessions(self, sessions: list):
+        """Replace the session cards with freshly loaded sessions."""
         # Clear existing cards
         while self.sessions_grid.count():
             child = self.sessions_grid.takeAt(0)
             if child.widget():
                 child.widget().deleteLater()
         
-        sessions = data_manager.get_sessions()
-        
         if not sessions:
             no_sessions = QLabel("No sessions yet. Click 'New Session' to create your first session!")
             no_sessions.setStyleSheet("color: #6b7280; font-size: 14px; padding: 40px;")
@@ -15,6 +15,29 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from data_manager import data_manager, Student
+from background import BackgroundLoader
+
+# Enrollment status badge (text color, background, label), by status
+STATUS_COLORS = {
+    "enrolled": ("#22c55e", "#14532d", "Enrolled"),
+    "in_progress": ("#eab308", "#713f12", "In Progress"),
+    "not_enrolled": ("#6b7280", "#374151", "Not Enrolled"),
+}
+
+# Status badge stylesheets, built once per status instead of per row
+STATUS_BADGE_QSS = {
+    status: f"""
+                QLabel {{
+                    background-color: {bg};
+                    color: {fg};
+                    padding: 4px 12px;
+                    border-radius: 12px;
+                    font-size: 12px;
+                    font-weight: 500;
+                }}
+            """
+    for status, (fg, bg, _) in STATUS_COLORS.items()
+}
 
 
 class AddStudentDialog(QDialog):
@@ -153,6 +176,7 @@ class StudentsPage(QWidget):
     
     def __init__(self):
         super().__init__()
+        self.loader = BackgroundLoader(self.show_students, self)
         self.setup_ui()
     
     def setup_ui(self):
@@ -276,9 +300,11 @@ class StudentsPage(QWidget):
         self.refresh_data()
     
     def refresh_data(self, search: str = ""):
-        """Refresh student data from CSV."""
-        students = data_manager.get_students(search)
-        
+        """Refresh student data (queried off the GUI thread)."""
+        self.loader.load(data_manager.get_students, search)
+    
+    def show_students(self, students: list):
+        """Fill the table with freshly loaded students."""
         self.table.setRowCount(len(students))
         
         for row, student in enumerate(students):
@@ -307,25 +333,12 @@ class StudentsPage(QWidget):
             status_layout = QHBoxLayout(status_widget)
             status_layout.setContentsMargins(8, 4, 8, 4)
             
-            status_colors = {
-                "enrolled": ("#22c55e", "#14532d", "Enrolled"),
-                "in_progress": ("#eab308", "#713f12", "In Progress"),
-                "not_enrolled": ("#6b7280", "#374151", "Not Enrolled"),
-            }
-            
-            fg, bg, text = status_colors.get(student.enrollment_status, status_colors["not_enrolled"])
+            status = student.enrollment_status
+            if status not in STATUS_COLORS:
+                status = "not_enrolled"
             
-            status_label = QLabel(text)
-            status_label.setStyleSheet(f"""
-                QLabel {{
-                    background-color: {bg};
-                    color: {fg};
-                    padding: 4px 12px;
-                    border-radius: 12px;
-                    font-size: 12px;
-                    font-weight: 500;
-                }}
-            """)
+            status_label = QLabel(STATUS_COLORS[status][2])
+            status_label.setStyleSheet(STATUS_BADGE_QSS[status])
             status_layout.addWidget(status_label)
             status_layout.addStretch()
             
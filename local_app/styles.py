@@ -0,0 +1,339 @@
+"""
+Application-wide Qt stylesheet for AI Classroom Monitor
+Loaded once in main() via QApplication.setStyleSheet; widgets opt in with
+setObjectName() and, for color variants, a "variant" dynamic property.
+
+Rules are scoped by their container (e.g. "QFrame#StatCard QFrame") so they
+resolve the same way the old per-widget sheets cascaded onto child widgets.
+Plain window and text colors come from dark_palette() instead of rules.
+"""
+
+from PyQt6.QtGui import QColor, QPalette
+
+# Palette colors, by role
+PALETTE_COLORS = {
+    QPalette.ColorRole.Window: "#111827",
+    QPalette.ColorRole.WindowText: "#ffffff",
+    QPalette.ColorRole.Base: "#1f2937",
+    QPalette.ColorRole.AlternateBase: "#374151",
+    QPalette.ColorRole.Text: "#ffffff",
+    QPalette.ColorRole.PlaceholderText: "#9ca3af",
+    QPalette.ColorRole.Button: "#374151",
+    QPalette.ColorRole.ButtonText: "#ffffff",
+    QPalette.ColorRole.Highlight: "#4f46e5",
+    QPalette.ColorRole.HighlightedText: "#ffffff",
+    QPalette.ColorRole.ToolTipBase: "#1f2937",
+    QPalette.ColorRole.ToolTipText: "#ffffff",
+}
+
+
+def dark_palette() -> QPalette:
+    """Build the application palette."""
+    palette = QPalette()
+    for role, color in PALETTE_COLORS.items():
+        palette.setColor(role, QColor(color))
+    return palette
+
+
+APP_STYLESHEET = """
+/* ===================== GENERAL CONTROLS ===================== */
+
+QScrollArea {
+    border: none;
+    background-color: #111827;
+}
+QScrollBar:vertical {
+    background-color: #1f2937;
+    width: 12px;
+    border-radius: 6px;
+}
+QScrollBar::handle:vertical {
+    background-color: #4b5563;
+    border-radius: 6px;
+    min-height: 20px;
+}
+QScrollBar::handle:vertical:hover {
+    background-color: #6b7280;
+}
+QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
+    height: 0px;
+}
+QScrollBar:horizontal {
+    background-color: #1f2937;
+    height: 12px;
+    border-radius: 6px;
+}
+QScrollBar::handle:horizontal {
+    background-color: #4b5563;
+    border-radius: 6px;
+    min-width: 20px;
+}
+QLineEdit, QTextEdit, QSpinBox, QComboBox {
+    background-color: #374151;
+    border: 1px solid #4b5563;
+    border-radius: 8px;
+    padding: 8px 12px;
+    color: #ffffff;
+    font-size: 14px;
+}
+QLineEdit:focus, QTextEdit:focus {
+    border-color: #4f46e5;
+}
+QComboBox::drop-down {
+    border: none;
+    padding-right: 10px;
+}
+QComboBox QAbstractItemView {
+    background-color: #374151;
+    color: #ffffff;
+    selection-background-color: #4f46e5;
+}
+QTableWidget {
+    background-color: #1f2937;
+    border: none;
+    gridline-color: #374151;
+    color: #ffffff;
+}
+QTableWidget::item {
+    padding: 8px;
+    border-bottom: 1px solid #374151;
+}
+QTableWidget::item:selected {
+    background-color: #4f46e5;
+}
+QHeaderView::section {
+    background-color: #1f2937;
+    color: #9ca3af;
+    font-weight: bold;
+    padding: 10px;
+    border: none;
+    border-bottom: 1px solid #374151;
+}
+QMessageBox {
+    background-color: #1f2937;
+}
+QMessageBox QLabel {
+    color: #ffffff;
+}
+QDialog {
+    background-color: #1f2937;
+}
+
+/* ===================== MAIN WINDOW ===================== */
+
+/* Page background (children get it from the palette) */
+#ContentArea {
+    background-color: #111827;
+}
+
+/* ===================== SIDEBAR ===================== */
+
+QFrame#Sidebar, QFrame#Sidebar QFrame {
+    background-color: #1f2937;
+    border-right: 1px solid #374151;
+}
+QFrame#Sidebar QLabel#SidebarLogoText {
+    color: #ffffff;
+    font-size: 18px;
+    font-weight: bold;
+}
+QFrame#Sidebar QFrame#SidebarSeparator {
+    background-color: #374151;
+}
+QFrame#Sidebar QFrame#SidebarInfo, QFrame#Sidebar QFrame#SidebarInfo QFrame {
+    background-color: #374151;
+    border-radius: 8px;
+    border: none;
+}
+QFrame#Sidebar QLabel#SidebarStatus {
+    color: #34d399;
+    font-size: 12px;
+}
+QFrame#Sidebar QLabel#SidebarVersion {
+    color: #6b7280;
+    font-size: 11px;
+}
+
+QPushButton#SidebarButton {
+    background-color: transparent;
+    color: #9ca3af;
+    border: none;
+    border-radius: 8px;
+    text-align: left;
+    padding-left: 12px;
+    font-size: 14px;
+    font-weight: 500;
+}
+QPushButton#SidebarButton:hover {
+    background-color: #374151;
+    color: #ffffff;
+}
+QPushButton#SidebarButton:checked {
+    background-color: #4f46e5;
+    color: #ffffff;
+}
+
+/* ===================== DASHBOARD STAT CARDS ===================== */
+
+QFrame#StatCard, QFrame#StatCard QFrame {
+    background-color: #1f2937;
+    border-radius: 12px;
+    padding: 8px;
+}
+QFrame#StatCard QFrame#StatIcon, QFrame#StatCard QFrame#StatIcon QFrame {
+    background-color: #312e81;
+    border-radius: 12px;
+}
+QFrame#StatCard[variant="green"] QFrame#StatIcon,
+QFrame#StatCard[variant="green"] QFrame#StatIcon QFrame { background-color: #14532d; }
+QFrame#StatCard[variant="yellow"] QFrame#StatIcon,
+QFrame#StatCard[variant="yellow"] QFrame#StatIcon QFrame { background-color: #713f12; }
+QFrame#StatCard[variant="blue"] QFrame#StatIcon,
+QFrame#StatCard[variant="blue"] QFrame#StatIcon QFrame { background-color: #1e3a8a; }
+QFrame#StatCard[variant="red"] QFrame#StatIcon,
+QFrame#StatCard[variant="red"] QFrame#StatIcon QFrame { background-color: #7f1d1d; }
+
+QFrame#StatCard QLabel#StatLabel {
+    color: #9ca3af;
+    font-size: 14px;
+}
+QFrame#StatCard QLabel#StatValue {
+    color: #ffffff;
+    font-size: 28px;
+    font-weight: bold;
+}
+QFrame#StatCard QLabel#StatSubValue {
+    color: #6b7280;
+    font-size: 12px;
+}
+
+/* ===================== ANALYTICS WINDOW ===================== */
+
+/* Window background (children get it from the palette) */
+#AnalyticsWindow {
+    background-color: #111827;
+}
+
+QLabel#LoadingLabel {
+    color: #9ca3af;
+    font-size: 14px;
+}
+
+QPushButton#BackButton {
+    background-color: transparent;
+    color: #9ca3af;
+    border: none;
+    font-size: 14px;
+    padding: 8px 0;
+}
+QPushButton#BackButton:hover {
+    color: #ffffff;
+}
+
+QPushButton#ExportButton {
+    background-color: #374151;
+    color: #ffffff;
+    border: none;
+    border-radius: 8px;
+    padding: 10px 20px;
+    font-size: 13px;
+}
+QPushButton#ExportButton:hover {
+    background-color: #4b5563;
+}
+
+QScrollArea#AnalyticsScroll {
+    border: none;
+    background: transparent;
+}
+QWidget#AnalyticsContent {
+    background: transparent;
+}
+
+QFrame#Panel, QFrame#Panel QFrame {
+    background-color: #1f2937;
+    border-radius: 12px;
+}
+QFrame#Panel QLabel#PanelTitle {
+    color: #ffffff;
+    font-size: 16px;
+    font-weight: 600;
+}
+QFrame#Panel QLabel#SessionTitle {
+    color: #ffffff;
+    font-size: 22px;
+    font-weight: bold;
+}
+QFrame#Panel QLabel#SessionDetails {
+    color: #9ca3af;
+    font-size: 14px;
+}
+QFrame#Panel QLabel#DurationBadge {
+    background-color: #312e81;
+    color: #818cf8;
+    padding: 8px 16px;
+    border-radius: 8px;
+    font-size: 14px;
+    font-weight: 500;
+}
+
+QFrame#Panel QLabel#SummaryTable {
+    color: #9ca3af;
+    font-size: 13px;
+}
+
+QFrame#Panel QTableView#StudentTable {
+    background-color: #1f2937;
+    border: none;
+    gridline-color: #374151;
+}
+QTableView#StudentTable::item {
+    padding: 10px;
+    color: #ffffff;
+    border-bottom: 1px solid #374151;
+}
+QTableView#StudentTable::item:selected {
+    background-color: #4f46e5;
+}
+QTableView#StudentTable QHeaderView::section {
+    background-color: #1f2937;
+    color: #9ca3af;
+    font-weight: bold;
+    padding: 12px;
+    border: none;
+    border-bottom: 1px solid #374151;
+}
+
+/* ===================== ANALYTICS STAT CARDS ===================== */
+
+QFrame#AnalyticsStatCard, QFrame#AnalyticsStatCard QFrame {
+    background-color: #1f2937;
+    border-radius: 12px;
+}
+QFrame#AnalyticsStatCard QFrame#StatIcon, QFrame#AnalyticsStatCard QFrame#StatIcon QFrame {
+    background-color: #312e81;
+    border-radius: 12px;
+}
+QFrame#AnalyticsStatCard[variant="green"] QFrame#StatIcon,
+QFrame#AnalyticsStatCard[variant="green"] QFrame#StatIcon QFrame { background-color: #14532d; }
+QFrame#AnalyticsStatCard[variant="yellow"] QFrame#StatIcon,
+QFrame#AnalyticsStatCard[variant="yellow"] QFrame#StatIcon QFrame { background-color: #713f12; }
+QFrame#AnalyticsStatCard[variant="blue"] QFrame#StatIcon,
+QFrame#AnalyticsStatCard[variant="blue"] QFrame#StatIcon QFrame { background-color: #1e3a8a; }
+QFrame#AnalyticsStatCard[variant="red"] QFrame#StatIcon,
+QFrame#AnalyticsStatCard[variant="red"] QFrame#StatIcon QFrame { background-color: #7f1d1d; }
+
+QFrame#AnalyticsStatCard QLabel#StatValue {
+    color: #ffffff;
+    font-size: 28px;
+    font-weight: bold;
+}
+QFrame#AnalyticsStatCard QLabel#StatLabel {
+    color: #9ca3af;
+    font-size: 13px;
+}
+QFrame#AnalyticsStatCard QLabel#StatSubValue {
+    color: #6b7280;
+    font-size: 11px;
+}
+"""